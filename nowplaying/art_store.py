@@ -0,0 +1,394 @@
+"""
+Artwork store for Kodi Now Playing application.
+Downloaded artwork is kept on disk under the hash of its content, with an index
+from the Kodi art path (or external URL) it came from to that blob. A repeat
+render of an item finds every image in the index and downloads nothing, and
+pages get stable /art/<blob> URLs the browser can cache for good.
+The store is bounded by a byte budget and a maximum age; the least recently
+used images go first, but never those of an item currently being shown.
+Downloads are streamed to a temporary file and renamed into place once
+complete, so a failed or oversized download never leaves a partial image.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+
+# Blob names are the sha256 of the image plus the extension of its format, which is what /art/<name> accepts
+BLOB_PATTERN = re.compile(r"^[0-9a-f]{64}\.(jpg|png|webp|gif)$")
+
+# Blob extension -> Content-Type it is served with
+IMAGE_FORMATS = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+# Bytes needed to tell the formats apart (WebP is RIFF....WEBP)
+IMAGE_SIGNATURE_BYTES = 12
+
+INDEX_FILE = "index.json"
+
+# Kodi prefixes art it extracts or generates from a file with its kind: video@<path>
+EMBEDDED_ART_PATTERN = re.compile(r"^[a-z]+@")
+
+# Content types accepted for artwork; servers that do not say are given the benefit of the doubt
+IMAGE_CONTENT_TYPES = ("image/", "application/octet-stream")
+
+# Per-render files written before the store existed: /tmp/<uuid4 hex>_<art type>.jpg
+SESSION_FILE_PATTERN = re.compile(r"^[0-9a-f]{32}_[\w.]+\.jpg$")
+
+
+class ArtRejected(Exception):
+    """A download is not an image, or is bigger than the store accepts"""
+
+
+def image_extension(head, content_type=None):
+    """
+    Blob extension for an image, from its first bytes.
+
+    Args:
+        head (bytes): Start of the image, at least IMAGE_SIGNATURE_BYTES when it is that long
+        content_type (str): Content-Type the server sent, used when the bytes are not recognised
+
+    Returns:
+        str: A key of IMAGE_FORMATS, "jpg" when nothing says otherwise
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    mime = (content_type or "").split(";")[0].strip().lower()
+    for extension, format_type in IMAGE_FORMATS.items():
+        if mime == format_type:
+            return extension
+    return "jpg"
+
+
+def blob_content_type(blob):
+    """Content-Type to serve a blob with, from its extension"""
+    return IMAGE_FORMATS.get(blob.rsplit(".", 1)[-1], "image/jpeg")
+
+
+def art_source(path, namespace=None):
+    """
+    Index key for a piece of artwork.
+
+    Kodi hands out art as image://<quoted path>/; the key is that path unquoted,
+    so the same image is found again whichever way Kodi wrapped it. Network
+    shares and web URLs name the same file for every Kodi and are keyed as they
+    are; only host-local paths (special://, local files) get the namespace.
+
+    Args:
+        path (str): Art path from Kodi (image://..., nfs://..., http(s)://...)
+        namespace (str): Library the path belongs to, None for a shared library
+
+    Returns:
+        str: Key for the index, or None for an empty path
+    """
+    if not path:
+        return None
+    if path.startswith("image://"):
+        path = urllib.parse.unquote(path[len("image://"):])
+    path = path.rstrip("/")
+    if not namespace or not _host_local(path):
+        return path
+    return f"{namespace}|{path}"
+
+
+def _host_local(path):
+    """True for art paths that only mean something on the Kodi that handed them out"""
+    # Embedded and generated art (video@..., music@...) is local when its source file is
+    source = path.split("@", 1)[1] if EMBEDDED_ART_PATTERN.match(path) else path
+    if source.startswith(("special://", "file://")):
+        return True
+    return "://" not in source and not source.startswith("\\\\")
+
+
+class ArtStore:
+    """
+    Content-addressed artwork blobs plus an art path -> blob index, both kept in
+    one directory so they survive restarts.
+
+    A blob's modification time is its last use, so the least recently used order
+    survives restarts too. Blobs pinned for an item on screen are never evicted.
+
+    Args:
+        directory (str): Where blobs and the index live
+        max_bytes (int): Budget for all blobs together, 0 for no limit
+        max_age (float): Seconds an unused blob is kept, 0 for no limit
+        max_image_bytes (int): Largest single image accepted, 0 for no limit
+    """
+
+    def __init__(self, directory, max_bytes=0, max_age=0, max_image_bytes=0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_image_bytes = max_image_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.swept = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._pins = {}  # owner (Kodi host) -> blobs of the item it shows
+        os.makedirs(directory, exist_ok=True)
+        self._blobs = self._scan()  # blob -> [size, last use (time.time())]
+        self._index = self._load_index()
+
+    def path(self, blob):
+        return os.path.join(self.directory, blob)
+
+    def lookup(self, source, owner=None):
+        """
+        Blob already stored for an art path.
+
+        Args:
+            source (str): Key from art_source()
+            owner (str): Pin the blob for this owner when found
+
+        Returns:
+            str: Blob name, or None when the art has not been stored yet
+        """
+        if not source:
+            return None
+        with self._lock:
+            blob = self._index.get(source)
+            if blob in self._blobs:
+                self.hits += 1
+                self._touch(blob)
+                if owner:
+                    self._pins.setdefault(owner, set()).add(blob)
+                return blob
+            self.misses += 1
+            return None
+
+    def put_stream(self, source, chunks, owner=None, content_type=None, content_length=None):
+        """
+        Store artwork as it arrives, chunk by chunk, and index it under its art path.
+
+        The declared type and length are checked before anything is written, and
+        the download is abandoned as soon as it grows past max_image_bytes.
+
+        Args:
+            source (str): Key from art_source(), None to store without indexing
+            chunks (iterable): Image bytes, e.g. response.iter_content()
+            owner (str): Pin the blob for this owner
+            content_type (str): Content-Type the server sent, if any
+            content_length (str): Content-Length the server sent, if any
+
+        Returns:
+            str: Blob name, served as /art/<name>
+
+        Raises:
+            ArtRejected: For a non-image content type or an image over max_image_bytes
+        """
+        if content_type and not content_type.lower().startswith(IMAGE_CONTENT_TYPES):
+            self._reject(f"content type {content_type} is not an image")
+        if content_length and str(content_length).isdigit() and self.max_image_bytes \
+                and int(content_length) > self.max_image_bytes:
+            self._reject(f"{content_length} bytes is over the {self.max_image_bytes} byte limit")
+
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if self.max_image_bytes and size > self.max_image_bytes:
+                        self._reject(f"image grew past the {self.max_image_bytes} byte limit")
+                    if len(head) < IMAGE_SIGNATURE_BYTES:
+                        head += chunk[:IMAGE_SIGNATURE_BYTES - len(head)]
+                    digest.update(chunk)
+                    f.write(chunk)
+            if size == 0:
+                self._reject("empty image")
+            blob = f"{digest.hexdigest()}.{image_extension(head, content_type)}"
+            # Placing the file and registering it happen under one lock, so an
+            # eviction by another render cannot remove the blob in between
+            with self._lock:
+                # Same content already stored: keep the existing file
+                if os.path.exists(self.path(blob)):
+                    os.unlink(tmp_path)
+                else:
+                    os.replace(tmp_path, self.path(blob))
+                self.stored += 1
+                self._blobs[blob] = [size, time.time()]
+                if owner:
+                    self._pins.setdefault(owner, set()).add(blob)
+                changed = source and self._index.get(source) != blob
+                if changed:
+                    self._index[source] = blob
+                if self._evict() or changed:
+                    self._save_index()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return blob
+
+    def pin(self, owner, blobs=()):
+        """
+        Protect the artwork an owner is showing from eviction, releasing what it
+        pinned before. lookup() and put_stream() with the same owner add to the set.
+
+        Args:
+            owner (str): Who shows the artwork, e.g. the Kodi host name
+            blobs (iterable): Blob names of the current item
+        """
+        with self._lock:
+            self._pins[owner] = set(blobs)
+
+    def sweep(self, session_dir=None):
+        """
+        Startup cleanup: drop blobs no index entry points to, leftover temporary
+        files, per-render files from before the store in session_dir, and
+        whatever is over the age or byte limits.
+
+        Args:
+            session_dir (str): Directory the old /tmp/<uuid>_<type>.jpg files were written to
+
+        Returns:
+            int: Files removed
+        """
+        orphans = []
+        with self._lock:
+            indexed = set(self._index.values())
+            for name in os.listdir(self.directory):
+                if name.startswith(".tmp-") or (BLOB_PATTERN.match(name) and name not in indexed):
+                    orphans.append(self.path(name))
+                    self._blobs.pop(name, None)
+        if session_dir and os.path.isdir(session_dir):
+            orphans.extend(os.path.join(session_dir, name) for name in os.listdir(session_dir)
+                           if SESSION_FILE_PATTERN.match(name))
+        removed = sum(1 for path in orphans if self._remove(path))
+        with self._lock:
+            self.swept += removed
+            if self._evict():
+                self._save_index()
+        print(f"[INFO] Artwork store sweep removed {removed} orphaned files", flush=True)
+        return removed
+
+    def _reject(self, reason):
+        with self._lock:
+            self.rejected += 1
+        raise ArtRejected(reason)
+
+    def _touch(self, blob):
+        now = time.time()
+        self._blobs[blob][1] = now
+        try:
+            os.utime(self.path(blob), (now, now))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Drop blobs past max_age, then least recently used ones until the store
+        fits max_bytes. Called with the lock held.
+
+        Returns:
+            bool: True when the index changed
+        """
+        pinned = set().union(*self._pins.values())
+        now = time.time()
+        total = sum(size for size, _ in self._blobs.values())
+        evict = []
+        for blob, (size, used) in sorted(self._blobs.items(), key=lambda entry: entry[1][1]):
+            if blob in pinned:
+                continue
+            expired = self.max_age and now - used > self.max_age
+            if not expired and (not self.max_bytes or total <= self.max_bytes):
+                break
+            evict.append(blob)
+            total -= size
+        if not evict:
+            return False
+        for blob in evict:
+            del self._blobs[blob]
+            self._remove(self.path(blob))
+        self.evicted += len(evict)
+        gone = set(evict)
+        self._index = {source: blob for source, blob in self._index.items() if blob not in gone}
+        print(f"[DEBUG] Artwork store evicted {len(evict)} images, {total} bytes left", flush=True)
+        return True
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"[WARNING] Failed to remove {path}: {e}", flush=True)
+            return False
+
+    def _scan(self):
+        blobs = {}
+        for name in os.listdir(self.directory):
+            if BLOB_PATTERN.match(name):
+                try:
+                    stat = os.stat(self.path(name))
+                except OSError:
+                    continue
+                blobs[name] = [stat.st_size, stat.st_mtime]
+        return blobs
+
+    def _write(self, name, content):
+        """Write through a temporary file so a reader never sees half an image"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _load_index(self):
+        try:
+            with open(self.path(INDEX_FILE)) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Ignoring unreadable artwork index: {e}", flush=True)
+            return {}
+        # Entries whose blob went missing would only cause misses later
+        index = {source: blob for source, blob in index.items() if blob in self._blobs}
+        print(f"[INFO] Artwork store at {self.directory} has {len(index)} indexed images", flush=True)
+        return index
+
+    def _save_index(self):
+        try:
+            self._write(INDEX_FILE, json.dumps(self._index).encode())
+        except OSError as e:
+            print(f"[WARNING] Failed to save artwork index: {e}", flush=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "indexed": len(self._index),
+                "blobs": len(self._blobs),
+                "bytes": sum(size for size, _ in self._blobs.values()),
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "pinned": len(set().union(*self._pins.values())),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stored": self.stored,
+                "evicted": self.evicted,
+                "swept": self.swept,
+                "rejected": self.rejected,
+                "max_image_bytes": self.max_image_bytes,
+            }
@@ -0,0 +1,99 @@
+"""
+Circuit breaker for Kodi Now Playing application.
+After repeated connection failures (Kodi asleep or switched off) the breaker
+opens and calls fail immediately instead of each waiting out the full timeout.
+After a cool-down a single probe call is let through to test recovery.
+"""
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures, open -> half-open
+    once reset_timeout has passed, then the single half-open probe either closes
+    the breaker again or re-opens it for another reset_timeout.
+
+    Args:
+        name (str): Service name used in logs
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds to stay open before probing
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=15):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0
+        self._probe_in_flight = False
+        self._transitions = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Ask whether a call may go ahead. Every allowed call must be followed by
+        record_success(), record_failure() or release().
+
+        Returns:
+            bool: False when the call should fail fast
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                print(f"[INFO] {self.name} circuit half-open, sending probe", flush=True)
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release(self):
+        """Give back an allowed call that ended without saying anything about the service"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _transition(self, state):
+        level = "INFO" if state == CLOSED else "WARNING"
+        print(f"[{level}] {self.name} circuit {self.state} -> {state} (failures: {self.failures})", flush=True)
+        self._transitions.append({"from": self.state, "to": state, "at": time.time()})
+        self.state = state
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "transitions": list(self._transitions),
+            }
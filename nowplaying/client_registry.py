@@ -0,0 +1,72 @@
+"""
+Client registry for Kodi Now Playing application.
+Knows whether any display is watching a Kodi host - through an open /events
+stream or a recent poll - so the background poller can drop to a slow
+heartbeat while nobody is looking and speed up again as soon as someone is.
+"""
+import threading
+import time
+
+
+class ClientRegistry:
+    """
+    Open event streams and recent polls for one Kodi host.
+
+    Args:
+        name (str): Host name used in logs
+        poll_window (float): Seconds a poll keeps its client counted as watching
+        on_watched (callable): Called when a client shows up while nobody was watching
+    """
+
+    def __init__(self, name, poll_window=30, on_watched=None):
+        self.name = name
+        self.poll_window = poll_window
+        self.on_watched = on_watched
+        self.streams = 0
+        self._polls = {}  # client -> time.monotonic() of its last poll
+        self._lock = threading.Lock()
+
+    @property
+    def watching(self):
+        with self._lock:
+            return self._watching(time.monotonic())
+
+    def poll(self, client):
+        """Record a request from client (usually its address)"""
+        with self._lock:
+            now = time.monotonic()
+            woke = not self._watching(now)
+            self._polls[client] = now
+            # Forget clients that went away so the registry stays small
+            for stale in [c for c, seen in self._polls.items() if now - seen >= self.poll_window]:
+                del self._polls[stale]
+        if woke:
+            self._woke(f"poll from {client}")
+
+    def stream_opened(self):
+        with self._lock:
+            woke = not self._watching(time.monotonic())
+            self.streams += 1
+        if woke:
+            self._woke("event stream")
+
+    def stream_closed(self):
+        with self._lock:
+            self.streams -= 1
+
+    def _watching(self, now):
+        return self.streams > 0 or any(now - seen < self.poll_window for seen in self._polls.values())
+
+    def _woke(self, reason):
+        print(f"[INFO] {self.name}: display connected ({reason}), resuming normal polling", flush=True)
+        if self.on_watched:
+            self.on_watched()
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "watching": self._watching(now),
+                "streams": self.streams,
+                "polling_clients": sum(1 for seen in self._polls.values() if now - seen < self.poll_window),
+            }
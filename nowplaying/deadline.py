@@ -0,0 +1,50 @@
+"""
+Request deadlines for Kodi Now Playing application.
+A Deadline is created once per page render and passed down to every RPC and
+download it triggers, so each outbound call only gets whatever time is left
+and the render as a whole cannot run much past its budget.
+"""
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a call when the deadline has already passed"""
+
+
+class Deadline:
+    """
+    Time budget shared by everything done for one request.
+
+    Args:
+        budget (float): Seconds from now until the deadline
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, connect, read):
+        """
+        (connect, read) timeout for one outbound request, each trimmed to the time left.
+
+        Args:
+            connect (float): Normal connect timeout in seconds
+            read (float): Normal read timeout in seconds
+
+        Returns:
+            tuple: Timeout suitable for requests' timeout= argument
+
+        Raises:
+            DeadlineExceeded: When no time is left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{self.budget}s deadline exceeded")
+        return (min(connect, remaining), min(read, remaining))
@@ -0,0 +1,133 @@
+"""
+Fallback path cache for Kodi Now Playing application.
+When Kodi cannot serve an item's artwork, the app hunts for it in the media
+folders, trying dozens of candidate files per art type. This remembers which
+candidates do not exist (for a while) and which one worked for each piece of
+artwork, so replaying an artist goes straight to the known-good file.
+"""
+import json
+import os
+import threading
+import time
+
+
+class FallbackPathCache:
+    """
+    Known-missing candidate paths, each with an expiry, and the candidate that
+    resolved per art path. Saved to a JSON file so it survives restarts.
+
+    Args:
+        path (str): JSON file the cache is kept in
+        ttl (float): Seconds a candidate stays known as missing
+        max_entries (int): Missing candidates kept at most, soonest to expire dropped first
+    """
+
+    def __init__(self, path, ttl=86400, max_entries=20000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.skipped = 0
+        self.shortcuts = 0
+        self._missing = {}   # candidate key -> time.time() it may be tried again
+        self._resolved = {}  # art path key -> candidate that worked
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def order(self, source, candidates, key):
+        """
+        Candidates worth trying for an art path: the one that worked before
+        first, without those known to be missing.
+
+        Args:
+            source (str): Key of the art path being replaced
+            candidates (list): Candidate paths, in the order they would be tried
+            key (callable): Cache key of a candidate
+
+        Returns:
+            list: Candidates to try, in order
+        """
+        now = time.time()
+        with self._lock:
+            known = self._resolved.get(source)
+            ordered = []
+            for candidate in candidates:
+                expires = self._missing.get(key(candidate))
+                if expires is not None and expires > now:
+                    self.skipped += 1
+                elif candidate == known:
+                    self.shortcuts += 1
+                    ordered.insert(0, candidate)
+                else:
+                    ordered.append(candidate)
+            return ordered
+
+    def found(self, source, candidate):
+        """Remember the candidate that resolved an art path"""
+        with self._lock:
+            if self._resolved.get(source) != candidate:
+                self._resolved[source] = candidate
+                self._dirty = True
+
+    def missing(self, source, candidate, key):
+        """
+        Remember that a candidate does not exist, and forget it as the art path's
+        known-good file if it was that.
+
+        Args:
+            source (str): Key of the art path being replaced
+            candidate (str): Candidate path that failed
+            key (str): Cache key of the candidate
+        """
+        with self._lock:
+            self._missing[key] = time.time() + self.ttl
+            if self._resolved.get(source) == candidate:
+                del self._resolved[source]
+            self._dirty = True
+
+    def save(self):
+        """Write the cache out if anything changed since the last save"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._prune()
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump({"missing": self._missing, "resolved": self._resolved}, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[WARNING] Failed to save fallback path cache: {e}", flush=True)
+
+    def _prune(self):
+        now = time.time()
+        self._missing = {key: expires for key, expires in self._missing.items() if expires > now}
+        if len(self._missing) > self.max_entries:
+            keep = sorted(self._missing.items(), key=lambda entry: entry[1])[-self.max_entries:]
+            self._missing = dict(keep)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._missing = dict(data.get("missing", {}))
+            self._resolved = dict(data.get("resolved", {}))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[WARNING] Ignoring unreadable fallback path cache: {e}", flush=True)
+            return
+        self._prune()
+        print(f"[INFO] Fallback path cache has {len(self._missing)} missing and {len(self._resolved)} resolved paths", flush=True)
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            return {
+                "missing": sum(1 for expires in self._missing.values() if expires > now),
+                "resolved": len(self._resolved),
+                "skipped": self.skipped,
+                "shortcuts": self.shortcuts,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,84 @@
+"""
+Shared HTTP connection pools for Kodi Now Playing application.
+Keeps one keep-alive session per Kodi host and one for external artwork hosts
+(fanart.tv, theaudiodb.com, ...) so repeat requests reuse TCP connections
+instead of opening a fresh one for every RPC and image download.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Name of the pool used for everything that is not a Kodi host
+EXTERNAL_POOL = "external"
+
+# Pool tuning - number of hosts cached per session and connections kept per host
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "1") != "0"
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session(auth):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.auth = auth
+    session.headers["Connection"] = "keep-alive" if HTTP_KEEP_ALIVE else "close"
+    return session
+
+
+def get_session(pool, auth=None):
+    """
+    Get the shared session for a pool, creating it on first use.
+
+    Args:
+        pool (str): Pool name - the Kodi host URL, or EXTERNAL_POOL for artwork hosts
+        auth (tuple): Basic auth credentials applied to every request in the pool
+
+    Returns:
+        requests.Session: Thread-safe pooled session
+    """
+    key = (pool, auth)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _build_session(auth)
+                _sessions[key] = session
+                print(f"[DEBUG] Created HTTP pool for {pool} (size {HTTP_POOL_SIZE}, keep-alive {HTTP_KEEP_ALIVE})", flush=True)
+    return session
+
+
+def pool_stats():
+    """
+    Collect connection reuse counts for every pool.
+
+    Returns:
+        dict: Pool name -> requests sent, connections opened and connections reused
+    """
+    stats = {}
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+    for (pool, _auth), session in sessions:
+        pool_requests = 0
+        pool_connections = 0
+        for adapter in set(session.adapters.values()):
+            host_pools = adapter.poolmanager.pools
+            for host_key in host_pools.keys():
+                host_pool = host_pools.get(host_key)
+                if host_pool is None:
+                    continue
+                pool_requests += host_pool.num_requests
+                pool_connections += host_pool.num_connections
+        stats[pool] = {
+            "requests": pool_requests,
+            "connections": pool_connections,
+            "reused": max(pool_requests - pool_connections, 0),
+        }
+    return stats
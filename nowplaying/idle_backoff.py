@@ -0,0 +1,91 @@
+"""
+Idle backoff for Kodi Now Playing application.
+While nothing is playing, Kodi is checked less and less often (doubling the
+gap each time up to a ceiling), so a display left on the idle page overnight
+costs next to no Kodi traffic. Playback, a Kodi notification or a display
+showing up resets it to the normal rate.
+"""
+import threading
+import time
+
+
+class IdleBackoff:
+    """
+    Exponentially growing gap between checks while nothing plays.
+
+    Args:
+        name (str): Host name used in logs
+        minimum (float): First gap in seconds once nothing is playing
+        maximum (float): Largest gap in seconds
+        factor (float): Growth of the gap after each idle check
+        limit (callable): Returns the largest gap allowed right now, or None for
+            maximum - e.g. a display is watching and nothing else reports playback
+    """
+
+    def __init__(self, name, minimum=5, maximum=300, factor=2.0, limit=None):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.limit = limit or (lambda: None)
+        self.delay = 0        # Current gap, 0 while not idle
+        self.checked_at = 0   # time.monotonic() of the last idle check
+        self._lock = threading.Lock()
+
+    @property
+    def idle(self):
+        return self.delay > 0
+
+    @property
+    def next_check(self):
+        """time.monotonic() the next check is due while idle"""
+        return self.checked_at + self._capped(self.delay)
+
+    def due(self):
+        """True when Kodi should be asked again - always, unless idling"""
+        return self.delay == 0 or time.monotonic() >= self.next_check
+
+    def wait(self):
+        """Seconds until the next idle check, 0 when not idling"""
+        if self.delay == 0:
+            return 0
+        return max(self.next_check - time.monotonic(), 0)
+
+    def _capped(self, delay):
+        # The limit can drop while a long gap is under way, so it applies to the gap already scheduled too
+        limit = self.limit()
+        return delay if limit is None else min(delay, limit)
+
+    def stopped(self):
+        """
+        A check found nothing playing - back off further.
+
+        Returns:
+            float: Seconds until the next check is due
+        """
+        with self._lock:
+            if self.delay == 0:
+                print(f"[INFO] {self.name}: nothing playing, backing off Kodi checks", flush=True)
+                self.delay = self.minimum
+            else:
+                self.delay = self._capped(min(self.delay * self.factor, self.maximum))
+            self.checked_at = time.monotonic()
+            return self.delay
+
+    def reset(self):
+        """Something plays or someone is looking - back to the normal rate"""
+        with self._lock:
+            if self.delay:
+                print(f"[INFO] {self.name}: leaving idle backoff", flush=True)
+            self.delay = 0
+            self.checked_at = 0
+
+    def stats(self):
+        return {
+            "idle": self.idle,
+            "delay": self.delay,
+            "next_check_in": round(self.wait(), 1),
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "limit": self.limit(),
+        }
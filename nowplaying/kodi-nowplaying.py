@@ -1,9 +1,26 @@
-from flask import Flask, render_template_string, request, jsonify, send_file
-import requests
+from flask import Flask, Response, abort, render_template_string, request, jsonify, send_file
+import functools
+import json
 import os
+import requests
+import time
 import urllib.parse
 import uuid
 from parser import route_media_display
+from art_store import BLOB_PATTERN, ArtStore, art_source, blob_content_type
+from fallback_cache import FallbackPathCache
+from circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from client_registry import ClientRegistry
+from deadline import Deadline, DeadlineExceeded
+from http_pool import EXTERNAL_POOL, get_session, pool_stats
+from idle_backoff import IdleBackoff
+from kodi_async import AsyncKodiClient
+from kodi_hosts import parse_kodi_hosts
+from kodi_notifications import LIBRARY_NOTIFICATIONS, PLAYER_NOTIFICATIONS, NotificationListener
+from playback_state import (STOPPED, PlaybackPoller, PlaybackState, PlayerStore, TrackedPlayer,
+                            kodi_time_to_seconds)
+from rpc_cache import LIBRARY_TYPE_METHODS, TTLCache, library_cache_key
+from singleflight import FlightTimeout, SingleFlight
 
 app = Flask(__name__)
 
@@ -14,15 +31,125 @@ KODI_PASS = os.getenv("KODI_PASS", "kodi_http_password")
 AUTH = (KODI_USER, KODI_PASS) if KODI_USER else None
 HEADERS = {"Content-Type": "application/json"}
 
+# Several Kodi boxes can be followed from one container, e.g.
+# KODI_HOSTS="living=http://192.168.1.10:8080,bedroom=http://192.168.1.11:8080".
+# Each gets its own /nowplaying/<name>, /state/<name>, ... routes and the first one
+# also answers the plain routes. Without KODI_HOSTS, KODI_HOST is the only host
+KODI_HOSTS = parse_kodi_hosts(os.getenv("KODI_HOSTS") or KODI_HOST, AUTH)
+kodi_hosts = {kodi.name: kodi for kodi in KODI_HOSTS}
+
+# Kodi RPCs fail fast once Kodi stops answering, with a single probe testing recovery
+KODI_BREAKER_THRESHOLD = int(os.getenv("KODI_BREAKER_THRESHOLD", "3"))
+KODI_BREAKER_RESET = float(os.getenv("KODI_BREAKER_RESET", "15"))
+
+# Per-call timeouts (seconds); a full /nowplaying render also shares one overall
+# deadline, and each call only gets what is left of it
+KODI_CONNECT_TIMEOUT = float(os.getenv("KODI_CONNECT_TIMEOUT", "3"))
+KODI_READ_TIMEOUT = float(os.getenv("KODI_READ_TIMEOUT", "8"))
+NOWPLAYING_DEADLINE = float(os.getenv("NOWPLAYING_DEADLINE", "15"))
+
+# Kodi calls a single render may have in flight at once
+KODI_CONCURRENCY = int(os.getenv("KODI_CONCURRENCY", "4"))
+
+# Artwork downloads run on their own pool, with a cap per image host so a render
+# with many fanart images neither queues them one by one nor floods Kodi's web server
+ART_DOWNLOAD_CONCURRENCY = int(os.getenv("ART_DOWNLOAD_CONCURRENCY", "8"))
+ART_DOWNLOADS_PER_HOST = int(os.getenv("ART_DOWNLOADS_PER_HOST", "4"))
+
+# Concurrent identical Kodi RPCs share one in-flight request
+rpc_flight = SingleFlight()
+
+# Library detail lookups are cached until Kodi reports a library change or the TTL runs out.
+# One cache serves every host; its entries are only shared between hosts when they
+# use the same (MySQL) library, since library ids mean different items otherwise
+LIBRARY_CACHE_SIZE = int(os.getenv("LIBRARY_CACHE_SIZE", "256"))
+LIBRARY_CACHE_TTL = float(os.getenv("LIBRARY_CACHE_TTL", "3600"))
+KODI_SHARED_LIBRARY = os.getenv("KODI_SHARED_LIBRARY", "0") == "1"
+library_cache = TTLCache(max_entries=LIBRARY_CACHE_SIZE, ttl=LIBRARY_CACHE_TTL)
+
+# Downloaded artwork, kept across renders and restarts under a hash of each image.
+# Least recently used images beyond the byte budget or max age are deleted, except
+# those of an item on screen
+ART_CACHE_DIR = os.getenv("ART_CACHE_DIR", "/tmp/art")
+ART_CACHE_MAX_MB = float(os.getenv("ART_CACHE_MAX_MB", "500"))
+ART_CACHE_MAX_AGE_DAYS = float(os.getenv("ART_CACHE_MAX_AGE_DAYS", "30"))
+# Downloads are streamed to disk; anything bigger than this is abandoned
+ART_MAX_IMAGE_MB = float(os.getenv("ART_MAX_IMAGE_MB", "20"))
+ART_CHUNK_SIZE = 64 * 1024
+art_store = ArtStore(ART_CACHE_DIR, max_bytes=int(ART_CACHE_MAX_MB * 1024 * 1024),
+                     max_age=ART_CACHE_MAX_AGE_DAYS * 24 * 3600,
+                     max_image_bytes=int(ART_MAX_IMAGE_MB * 1024 * 1024))
+art_store.sweep(session_dir="/tmp")
+ART_MAX_AGE = 365 * 24 * 3600
+
+# Artwork fallback candidates that turned out missing are skipped for this long,
+# and the candidate that worked for an art path is tried first next time
+ART_FALLBACK_MISS_TTL = float(os.getenv("ART_FALLBACK_MISS_TTL", "86400"))
+fallback_cache = FallbackPathCache(os.path.join(ART_CACHE_DIR, "fallback_paths.json"), ttl=ART_FALLBACK_MISS_TTL)
+
 ART_TYPES = ["poster", "fanart", "clearlogo", "clearart", "discart", "cdart", "banner", "season.poster", "thumbnail"]
 
-# Global variables to track episode transitions and prevent reload loops
-last_known_episode = None
-last_check_time = 0
-EPISODE_CHECK_INTERVAL = 10  # Check for episode changes every 10 seconds
+# Library detail properties requested for songs
+SONG_DETAILS_PROPERTIES = ["title", "album", "artist", "duration", "rating", "year", "genre", "fanart", "thumbnail", "albumid", "artistid", "bitrate", "channels", "samplerate", "bpm", "comment", "lyrics", "mood", "playcount", "track", "disc"]
+ALBUM_DETAILS_PROPERTIES = ["title", "artist", "year", "rating", "fanart", "thumbnail", "description", "genre", "mood", "style", "theme", "albumduration", "playcount", "albumlabel", "compilation", "totaldiscs"]
+ARTIST_DETAILS_PROPERTIES = ["fanart", "thumbnail", "description", "born", "formed", "died", "disbanded", "genre", "mood", "style", "yearsactive"]
+
+# Items and predicted ends per Kodi player, to track transitions and prevent reload loops
+player_store = PlayerStore()
+EPISODE_CHECK_INTERVAL = 10  # Check for episode changes every 10 seconds when the end of the item is unknown
+# Check for item changes at least this often (seconds) while the item plays towards its predicted end
+ITEM_CHECK_MAX_INTERVAL = float(os.getenv("ITEM_CHECK_MAX_INTERVAL", "300"))
+
+# Properties needed to identify the playing item
+ITEM_ID_PROPERTIES = ["title", "album", "artist", "showtitle", "season", "episode", "file"]
+
+# One background poller keeps a shared playback snapshot that /poll_playback and
+# /nowplaying?json=1 answer from, so Kodi load does not grow with open displays
+STATE_POLLER = os.getenv("STATE_POLLER", "1") != "0"
+STATE_POLL_INTERVAL = float(os.getenv("STATE_POLL_INTERVAL", "1"))
+STATE_POLL_INTERVAL_PUSHED = float(os.getenv("STATE_POLL_INTERVAL_PUSHED", "10"))
+
+# While no display has an /events stream open or polled within CLIENT_ACTIVE_WINDOW
+# seconds, the poller only checks in every STATE_POLL_INTERVAL_UNWATCHED seconds
+STATE_POLL_INTERVAL_UNWATCHED = float(os.getenv("STATE_POLL_INTERVAL_UNWATCHED", "60"))
+CLIENT_ACTIVE_WINDOW = float(os.getenv("CLIENT_ACTIVE_WINDOW", "30"))
+
+# While nothing plays, the gap between Kodi checks doubles from IDLE_BACKOFF_MIN up to
+# IDLE_BACKOFF_MAX seconds. Playback notifications and displays loading a page end it
+IDLE_BACKOFF_MIN = float(os.getenv("IDLE_BACKOFF_MIN", "5"))
+IDLE_BACKOFF_MAX = float(os.getenv("IDLE_BACKOFF_MAX", "300"))
+
+# Kodi pushes player notifications over its JSON-RPC TCP port - while that
+# connection is up the poller only runs as a slow consistency check
+KODI_TCP_PORT = int(os.getenv("KODI_TCP_PORT", "9090"))
+KODI_NOTIFICATIONS = os.getenv("KODI_NOTIFICATIONS", "1") != "0"
+
+# Pages follow playback over the /events stream; idle streams get a keep-alive
+# comment this often so dropped connections are noticed
+EVENTS_KEEPALIVE = float(os.getenv("EVENTS_KEEPALIVE", "15"))
+EVENTS_RETRY_MS = 3000
+
+# Longest a /poll_playback?since=<version> long-poll is held open waiting for a change
+LONG_POLL_TIMEOUT = float(os.getenv("LONG_POLL_TIMEOUT", "25"))
+
+# How soon /state tells polling pages to come back: slow while idle or paused,
+# normal while playing and fast in the last seconds of an item, so the next one
+# is picked up quickly
+CLIENT_POLL_SLOW_MS = int(os.getenv("CLIENT_POLL_SLOW_MS", "10000"))
+CLIENT_POLL_NORMAL_MS = int(os.getenv("CLIENT_POLL_NORMAL_MS", "4000"))
+CLIENT_POLL_FAST_MS = int(os.getenv("CLIENT_POLL_FAST_MS", "1000"))
+CLIENT_POLL_FAST_WINDOW = float(os.getenv("CLIENT_POLL_FAST_WINDOW", "10"))  # Seconds before the end of an item
+
+# Event ids and ETags carry this so a browser resuming after a restart is always resynced
+STATE_EPOCH = uuid.uuid4().hex[:8]
+# /nowplaying?json=1 hands out a fresh position at least this often even when
+# nothing changed, so client-side timers cannot drift far
+RESYNC_ETAG_SECONDS = 30
 
 @app.route("/")
 def index():
+    # Someone is looking - check Kodi at the normal rate again
+    KODI_HOSTS[0].poller.wake()
     return """
     <!DOCTYPE html>
     <html>
@@ -68,129 +195,332 @@ def index():
         <script>
             let lastPlaybackState = false; // Initialize to false
 
+            function handlePlaybackState(data) {
+                const currentState = data.playing;
+                if (currentState !== lastPlaybackState) {
+                    document.body.classList.add('fade-out');
+                    setTimeout(() => {
+                        window.location.href = '/nowplaying';
+                    }, 1500);
+                }
+                lastPlaybackState = currentState;
+            }
+
+            // ETag of the last answer - an unchanged state comes back as an empty 304
+            let pollEtag = null;
+            // How long to wait before the next poll - the server adjusts it to what is playing
+            let nextPollMs = 2000;
+
             function checkPlaybackChange() {
-                fetch('/poll_playback')
+                return fetch('/state', { headers: pollEtag ? { 'If-None-Match': pollEtag } : {} })
                     .then(res => {
+                        if (res.status === 304) return null;
                         if (!res.ok) {
                             throw new Error(`HTTP ${res.status}`);
                         }
+                        pollEtag = res.headers.get('ETag');
                         return res.json();
                     })
                     .then(data => {
-                        const currentState = data.playing;
-                        if (currentState !== lastPlaybackState) {
-                            document.body.classList.add('fade-out');
-                            setTimeout(() => {
-                                window.location.href = '/nowplaying';
-                            }, 1500);
-                        }
-                        lastPlaybackState = currentState;
+                        if (!data) return;
+                        if (data.next_poll_ms) nextPollMs = data.next_poll_ms;
+                        handlePlaybackState(data);
                     })
                     .catch(error => {
+                        // Don't change state on error, the next poll retries
                         console.error('Polling error:', error);
-                        // Don't change state on error, just retry
-                        setTimeout(checkPlaybackChange, 3000);
                     });
             }
-            setInterval(checkPlaybackChange, 2000); // Poll every 2 seconds
+
+            // Wait for playback to start over /events, polling only without it
+            let pollTimer = null;
+            function startPolling() {
+                if (!pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+            }
+            function pollState() {
+                checkPlaybackChange().finally(() => {
+                    if (pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+                });
+            }
+            function stopPolling() {
+                clearTimeout(pollTimer);
+                pollTimer = null;
+            }
+            let events = null;
+            function listenForPlaybackEvents() {
+                if (!window.EventSource) {
+                    startPolling();
+                    return;
+                }
+                events = new EventSource('/events');
+                events.onopen = stopPolling;
+                events.onerror = startPolling;
+                events.onmessage = (event) => handlePlaybackState(JSON.parse(event.data));
+            }
+            // A hidden tab stops waiting for playback, so it does not keep the server polling Kodi
+            document.addEventListener('visibilitychange', () => {
+                if (document.hidden) {
+                    if (events) events.close();
+                    events = null;
+                    stopPolling();
+                    return;
+                }
+                pollEtag = null;
+                checkPlaybackChange();
+                listenForPlaybackEvents();
+            });
+            listenForPlaybackEvents();
         </script>
     </body>
     </html>
     """
 
+def make_item_id(item):
+    """
+    Build a stable identifier for a playing item from its Kodi database ID.
+    
+    Args:
+        item (dict): Item from Player.GetItem or a Player.OnPlay notification
+        
+    Returns:
+        str: Identifier such as 'song_42', or 'other_<title>' for items outside the library
+    """
+    item_id = item.get("id")
+    if item.get("type") == "song" and item_id:
+        current_item_id = f"song_{item_id}"
+        print(f"[DEBUG] Song ID: {item_id} - {item.get('title', 'unknown')}", flush=True)
+    elif item.get("type") == "episode" and item_id:
+        current_item_id = f"episode_{item_id}"
+        print(f"[DEBUG] Episode ID: {item_id} - {item.get('showtitle', '')} S{item.get('season', 0):02d}E{item.get('episode', 0):02d}", flush=True)
+    elif item.get("type") == "movie" and item_id:
+        current_item_id = f"movie_{item_id}"
+        print(f"[DEBUG] Movie ID: {item_id} - {item.get('title', 'unknown')}", flush=True)
+    else:
+        # Fallback to custom ID if no database ID available
+        current_item_id = f"other_{item.get('title', 'unknown')}"
+        print(f"[DEBUG] No database ID available, using fallback: {current_item_id}", flush=True)
+    return current_item_id
+
+def fetch_playback(kodi, check_item):
+    """
+    Sample the active player for a host's background poller.
+    
+    Args:
+        kodi (KodiHost): Kodi to ask
+        check_item (bool): Also fetch the current item to identify it
+        
+    Returns:
+        dict: player_id, item_id, speed, time and totaltime, or None when nothing is playing
+    """
+    player = fetch_active_player(
+        kodi,
+        item_properties=ITEM_ID_PROPERTIES if check_item else None,
+        progress_properties=["time", "totaltime", "speed"]
+    )
+    if not player:
+        return None
+    progress = player["progress"]
+    return {
+        "player_id": player["playerid"],
+        "item_id": make_item_id(player["item"]) if player["item"] else None,
+        "speed": progress.get("speed", 0),
+        "time": kodi_time_to_seconds(progress.get("time")),
+        "totaltime": kodi_time_to_seconds(progress.get("totaltime"))
+    }
+
+def on_kodi_notification(kodi, method, data):
+    """Apply a notification from one Kodi to its playback state and the library cache"""
+    if method in LIBRARY_NOTIFICATIONS:
+        on_library_notification(kodi, method, data)
+        return
+    player = data.get("player", {})
+    if method in ("Player.OnPlay", "Player.OnAVStart"):
+        item = data.get("item", {})
+        changes = {"playing": True, "player_id": player.get("playerid"), "speed": player.get("speed", 1)}
+        if item:
+            changes["item_id"] = make_item_id(item)
+        if player.get("time"):
+            changes["time"] = kodi_time_to_seconds(player["time"])
+        state = kodi.poller.apply_event(**changes)
+    elif method == "Player.OnPause":
+        state = kodi.poller.apply_event(playing=True, speed=0)
+    elif method == "Player.OnResume":
+        state = kodi.poller.apply_event(playing=True, speed=player.get("speed") or 1)
+    elif method == "Player.OnStop":
+        state = kodi.poller.apply_event(**STOPPED)
+    elif method == "Player.OnSeek":
+        state = kodi.poller.apply_event(time=kodi_time_to_seconds(player.get("time")))
+    else:
+        return
+    print(f"[DEBUG] {kodi.name} playback state after {method}: {state}", flush=True)
+
+def on_library_notification(kodi, method, data):
+    """Drop cached library details that a Kodi library notification says are stale"""
+    item = data.get("item") or {}
+    details_method = LIBRARY_TYPE_METHODS.get(item.get("type") or data.get("type"))
+    item_id = item.get("id", data.get("id"))
+    library_name = library_for(kodi)
+    if method.endswith((".OnUpdate", ".OnRemove")) and details_method and item_id is not None:
+        dropped = library_cache.invalidate(
+            lambda key: key[0] == details_method and key[1] == item_id and key[3] == library_name)
+    else:
+        # Scans and cleans can touch anything in that library
+        library = method.split(".")[0]
+        dropped = library_cache.invalidate(lambda key: key[0].startswith(library + ".") and key[3] == library_name)
+    print(f"[DEBUG] Library cache dropped {dropped} entries after {method} from {kodi.name}", flush=True)
+
+def library_for(kodi):
+    """Name a host's library is cached under - one name for all hosts when they share a library"""
+    return None if KODI_SHARED_LIBRARY else kodi.name
+
+def kodi_for(host):
+    """
+    KodiHost a route was asked about.
+    
+    Args:
+        host (str): Name from the URL, or None for the plain routes
+        
+    Returns:
+        KodiHost: The named host, or the first configured one (404 for unknown names)
+    """
+    if host is None:
+        return KODI_HOSTS[0]
+    kodi = kodi_hosts.get(host)
+    if kodi is None:
+        abort(404)
+    return kodi
+
+def start_background_services():
+    """Start each host's playback poller and the Kodi notification listener feeding it"""
+    if not STATE_POLLER:
+        print(f"[INFO] Background poller disabled, querying Kodi per request", flush=True)
+        return
+    for kodi in KODI_HOSTS:
+        kodi.poller.start()
+        if KODI_NOTIFICATIONS and kodi.listener.host:
+            kodi.listener.start()
+        else:
+            print(f"[INFO] Kodi notifications disabled for {kodi.name}, using polling only", flush=True)
+
+def conditional_json(etag, build):
+    """
+    JSON response tagged with etag, or an empty 304 when the client's If-None-Match
+    already names it - the payload is then never built or serialized.
+    
+    Args:
+        etag (str): Strong ETag identifying the payload
+        build (callable): Returns the payload
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def playback_state_response(state):
+    """/poll_playback payload for a playback snapshot"""
+    if not state.playing:
+        return {"playing": False, "version": state.version}
+    return {
+        "playing": True,
+        "paused": state.paused,
+        "item_id": state.item_id or "episode_unknown",
+        "item_type": "episode",
+        "version": state.version
+    }
+
+def idle_response(kodi, data):
+    """Answer for a host with nothing playing, flagging when Kodi itself is offline"""
+    if kodi.breaker.state == OPEN:
+        # Kodi is offline and the call failed fast
+        data.update({"error": True, "kodi_unavailable": True})
+    return data
+
 @app.route("/poll_playback")
-def poll_playback():
-    global last_known_episode, last_check_time
+@app.route("/poll_playback/<host>")
+def poll_playback(host=None):
+    kodi = kodi_for(host)
+    kodi.clients.poll(request.remote_addr)
     
+    # The background poller already knows the state - answer from memory
+    if kodi.poller.running:
+        state = kodi.poller.snapshot()
+        since = request.args.get("since", type=int)
+        if since is not None and since == state.version:
+            # Long-poll: hold the request until the state moves on or the timeout passes
+            timeout = min(request.args.get("timeout", LONG_POLL_TIMEOUT, type=float), LONG_POLL_TIMEOUT)
+            state = kodi.poller.wait_for_change(since, max(timeout, 0))
+        kodi_unavailable = kodi.breaker.state == OPEN
+        
+        def build():
+            response = playback_state_response(state)
+            if kodi_unavailable:
+                response["kodi_unavailable"] = True
+            return response
+        etag = f"{STATE_EPOCH}-{state.version}" + ("-offline" if kodi_unavailable else "")
+        return conditional_json(etag, build)
+    
+    # Poller not running - query Kodi for this request, unless nothing was playing
+    # at the last check and the idle backoff says it is too soon to ask again
+    if not kodi.idle.due():
+        return jsonify(idle_response(kodi, {"playing": False}))
     try:
-        players = kodi_rpc("Player.GetActivePlayers")
-        if players and players.get("result"):
-            # Always try to get current episode info
-            import time
-            current_time = time.time()
+        current_time = time.time()
+        now = time.monotonic()
+        
+        # Verify items just after they are predicted to end, OR if we don't have item info yet
+        tracked_players = player_store.players(kodi.name)
+        check_item = not tracked_players or any(
+            tracked.item_check_due(now, EPISODE_CHECK_INTERVAL, ITEM_CHECK_MAX_INTERVAL)
+            for tracked in tracked_players.values()
+        )
+        
+        # Active players, progress and (when due) their current items in a single round trip
+        players = fetch_active_players(
+            kodi,
+            item_properties=ITEM_ID_PROPERTIES if check_item else None,
+            progress_properties=["speed", "time", "totaltime"]
+        )
+        # Players that stopped start over when they play again
+        player_store.retain(kodi.name, {player["playerid"] for player in players})
+        if players:
+            kodi.idle.reset()
+            results = [record_player_sample(kodi.name, player, now, check_item) for player in players]
             
-            # Check if it's time to verify episode (every 10 seconds) OR if we don't have episode info yet
-            if current_time - last_check_time >= EPISODE_CHECK_INTERVAL or last_known_episode is None:
-                last_check_time = current_time
-                
-                try:
-                    # Get active players first
-                    players_response = kodi_rpc("Player.GetActivePlayers", {})
-                    if players_response and players_response.get("result"):
-                        active_players = players_response.get("result", [])
-                        if active_players:
-                            player_id = active_players[0].get("playerid")
-                            item = kodi_rpc("Player.GetItem", {"playerid": player_id, "properties": ["title", "album", "artist", "showtitle", "season", "episode", "file"]})
-                            if item and item.get("result") and item.get("result", {}).get("item"):
-                                current_item = item.get("result", {}).get("item", {})
-                                
-                                # Create current item identifier using actual database IDs
-                                current_item_id = ""
-                                item_id = current_item.get("id")
-                                if current_item.get("type") == "song" and item_id:
-                                    current_item_id = f"song_{item_id}"
-                                    print(f"[DEBUG] Song ID: {item_id} - {current_item.get('title', 'unknown')}", flush=True)
-                                elif current_item.get("type") == "episode" and item_id:
-                                    current_item_id = f"episode_{item_id}"
-                                    print(f"[DEBUG] Episode ID: {item_id} - {current_item.get('showtitle', '')} S{current_item.get('season', 0):02d}E{current_item.get('episode', 0):02d}", flush=True)
-                                elif current_item.get("type") == "movie" and item_id:
-                                    current_item_id = f"movie_{item_id}"
-                                    print(f"[DEBUG] Movie ID: {item_id} - {current_item.get('title', 'unknown')}", flush=True)
-                                else:
-                                    # Fallback to custom ID if no database ID available
-                                    current_item_id = f"other_{current_item.get('title', 'unknown')}"
-                                    print(f"[DEBUG] No database ID available, using fallback: {current_item_id}", flush=True)
-                                
-                                # Check if item has changed
-                                if last_known_episode is not None and current_item_id != last_known_episode:
-                                    print(f"[DEBUG] Item changed: {last_known_episode} -> {current_item_id}", flush=True)
-                                    last_known_episode = current_item_id
-                                    # Return unique ID to trigger reload
-                                    change_id = f"item_changed_{int(current_time)}"
-                                    return jsonify({
-                                        "playing": True, 
-                                        "item_id": change_id,
-                                        "item_type": "item_change"
-                                    })
-                                
-                                # Update last known item
-                                if last_known_episode != current_item_id:
-                                    print(f"[DEBUG] Setting item: {current_item_id}", flush=True)
-                                    last_known_episode = current_item_id
-                                else:
-                                    print(f"[DEBUG] Item check: {current_item_id} (no change)", flush=True)
-                            else:
-                                print(f"[DEBUG] Failed to get episode info from Player.GetItem", flush=True)
-                        else:
-                            print(f"[DEBUG] No active players found", flush=True)
-                    else:
-                        print(f"[DEBUG] Failed to get active players", flush=True)
-                        
-                except Exception as e:
-                    print(f"[DEBUG] Failed to check episode: {e}", flush=True)
+            # The page shows the first active player
+            previous, tracked = results[0]
+            if check_item and tracked is not previous:
+                if not players[0]["item"]:
+                    print(f"[DEBUG] Failed to get episode info from Player.GetItem", flush=True)
+                elif previous is not None and previous.item_id is not None and tracked.item_id != previous.item_id:
+                    print(f"[DEBUG] Item changed: {previous.item_id} -> {tracked.item_id}", flush=True)
+                    # Return unique ID to trigger reload
+                    change_id = f"item_changed_{int(current_time)}"
+                    return jsonify({
+                        "playing": True, 
+                        "item_id": change_id,
+                        "item_type": "item_change"
+                    })
+                elif previous is None or previous.item_id != tracked.item_id:
+                    print(f"[DEBUG] Setting item: {tracked.item_id}", flush=True)
+                else:
+                    print(f"[DEBUG] Item check: {tracked.item_id} (no change)", flush=True)
+            elif tracked.recheck and not (previous and previous.recheck):
+                print(f"[DEBUG] Predicted end moved, checking item on next poll", flush=True)
             
-            # Get player properties to check pause state
-            active_players = players.get("result", [])
-            if active_players:
-                player_id = active_players[0].get("playerid")
-                progress_response = kodi_rpc("Player.GetProperties", {
-                    "playerid": player_id,
-                    "properties": ["speed"]
-                })
-                speed = 0
-                if progress_response and progress_response.get("result"):
-                    speed = progress_response.get("result", {}).get("speed", 0)
-                
-                is_paused = speed == 0
-            else:
-                is_paused = False
+            # Pause state from the player properties fetched in the same batch
+            speed = players[0]["progress"].get("speed", 0)
+            is_paused = speed == 0
+
             
             # Return current episode ID (stable) with pause state
-            if last_known_episode:
+            if tracked.item_id:
                 return jsonify({
                     "playing": True, 
                     "paused": is_paused,
-                    "item_id": last_known_episode,
+                    "item_id": tracked.item_id,
                     "item_type": "episode"
                 })
             else:
@@ -202,16 +532,237 @@ def poll_playback():
                     "item_type": "episode"
                 })
             
-        # No active players - reset tracking variables
-        last_known_episode = None
-        last_check_time = 0
-        return jsonify({"playing": False})
+        # No active players
+        kodi.idle.stopped()
+        return jsonify(idle_response(kodi, {"playing": False}))
     except Exception as e:
         print(f"[ERROR] Poll playback failed: {e}", flush=True)
         # Return False on error - this will trigger retry logic on frontend
         return jsonify({"playing": False, "error": True})
 
-def kodi_rpc(method, params=None):
+def record_player_sample(host, player, now, check_item):
+    """
+    Record one sampled player in player_store.
+    
+    Args:
+        host (str): Kodi host the player belongs to
+        player (dict): Active player from fetch_active_players
+        now (float): time.monotonic() the sample was requested
+        check_item (bool): The sample included the player's item
+        
+    Returns:
+        tuple: (previous TrackedPlayer or None, new TrackedPlayer)
+    """
+    progress = player["progress"]
+    ends_at = PlaybackState(
+        playing=True,
+        speed=progress.get("speed", 0),
+        time=kodi_time_to_seconds(progress.get("time")),
+        totaltime=kodi_time_to_seconds(progress.get("totaltime")),
+        updated_at=now
+    ).ends_at
+    item_id = make_item_id(player["item"]) if check_item and player["item"] else None
+    return player_store.update(
+        host,
+        player["playerid"],
+        lambda tracked: (tracked or TrackedPlayer()).record(now, ends_at, item_id, check_item)
+    )
+
+def playback_event_name(previous, state):
+    """What happened between two snapshots: play, stop, item, pause, resume, update or seek"""
+    if not state.playing:
+        return "stop"
+    if not previous.playing:
+        return "play"
+    if state.item_id != previous.item_id:
+        return "item"
+    if state.paused != previous.paused:
+        return "pause" if state.paused else "resume"
+    if state.totaltime != previous.totaltime:
+        # The item's length arriving after a play notification
+        return "update"
+    return "seek"
+
+def next_poll_ms(state):
+    """Milliseconds a polling page should wait before asking for /state again"""
+    if not state.playing or state.paused:
+        return CLIENT_POLL_SLOW_MS
+    ends_at = state.ends_at
+    if ends_at is None:
+        return CLIENT_POLL_NORMAL_MS
+    # Land the next poll right at the start of the fast window rather than past it
+    until_window = ends_at - time.monotonic() - CLIENT_POLL_FAST_WINDOW
+    return int(max(CLIENT_POLL_FAST_MS, min(CLIENT_POLL_NORMAL_MS, until_window * 1000)))
+
+def playback_state_summary(state):
+    """/state and /events payload - everything a page follows, from one snapshot"""
+    data = playback_state_response(state)
+    data.setdefault("paused", True)
+    data.update({
+        "elapsed": int(state.elapsed()),
+        "duration": int(state.totaltime),
+        "next_poll_ms": next_poll_ms(state)
+    })
+    return data
+
+@app.route("/state")
+@app.route("/state/<host>")
+def playback_summary(host=None):
+    """
+    Playing/paused, item id, position, duration and version in one answer, so a
+    page needs a single timer instead of /poll_playback plus /nowplaying?json=1.
+    """
+    kodi = kodi_for(host)
+    kodi.clients.poll(request.remote_addr)
+    if kodi.poller.running:
+        state = kodi.poller.snapshot()
+        kodi_unavailable = kodi.breaker.state == OPEN
+        
+        def build():
+            data = playback_state_summary(state)
+            if kodi_unavailable:
+                data["kodi_unavailable"] = True
+            return data
+        # Clients extrapolate the position between changes - see RESYNC_ETAG_SECONDS.
+        # A new polling hint must get through as well, so it is part of the tag
+        etag = f"{STATE_EPOCH}-{state.version}-{int(state.elapsed()) // RESYNC_ETAG_SECONDS}-{next_poll_ms(state)}"
+        if kodi_unavailable:
+            etag += "-offline"
+        return conditional_json(etag, build)
+    
+    # Poller not running - one batched Kodi round trip for player, item and progress
+    # (none while idle backoff says nothing played a moment ago)
+    if not kodi.idle.due():
+        return jsonify(idle_response(kodi, playback_state_summary(PlaybackState())))
+    try:
+        playback = fetch_playback(kodi, True)
+    except Exception as e:
+        print(f"[ERROR] State lookup failed: {e}", flush=True)
+        return jsonify({"playing": False, "paused": True, "elapsed": 0, "duration": 0, "error": True})
+    if playback is None:
+        kodi.idle.stopped()
+        return jsonify(idle_response(kodi, playback_state_summary(PlaybackState())))
+    kodi.idle.reset()
+    return jsonify(playback_state_summary(PlaybackState(
+        playing=True,
+        player_id=playback["player_id"],
+        item_id=playback["item_id"],
+        speed=playback["speed"],
+        time=playback["time"],
+        totaltime=playback["totaltime"],
+        updated_at=time.monotonic()
+    )))
+
+def playback_event(state, name):
+    """One Server-Sent Event carrying a playback snapshot"""
+    data = playback_state_summary(state)
+    data["event"] = name
+    return f"id: {STATE_EPOCH}-{state.version}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/events")
+@app.route("/events/<host>")
+def playback_events(host=None):
+    """
+    Server-Sent Events stream of playback changes (play, pause, resume, seek,
+    item change, stop), each carrying the new state version. A reconnecting
+    browser sends Last-Event-ID and only gets a resync when it missed something.
+    """
+    kodi = kodi_for(host)
+    if not kodi.poller.running:
+        # 204 stops EventSource from reconnecting, so pages fall back to polling
+        return "", 204
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    
+    def stream():
+        # An open stream keeps the poller at full speed until the browser goes away
+        kodi.clients.stream_opened()
+        try:
+            yield f"retry: {EVENTS_RETRY_MS}\n\n"
+            state = kodi.poller.snapshot()
+            if last_event_id != f"{STATE_EPOCH}-{state.version}":
+                yield playback_event(state, "sync")
+            while True:
+                latest = kodi.poller.wait_for_change(state.version, EVENTS_KEEPALIVE)
+                if latest.version == state.version:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield playback_event(latest, playback_event_name(state, latest))
+                state = latest
+        finally:
+            kodi.clients.stream_closed()
+    
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+def deadline_passed(deadline, skipped):
+    """True once the request deadline is up - logs the optional work being skipped"""
+    if deadline is not None and deadline.expired:
+        print(f"[DEBUG] Deadline passed, skipping {skipped}", flush=True)
+        return True
+    return False
+
+def request_timeout(deadline, read):
+    """(connect, read) timeout for one outbound request, trimmed to what is left of the deadline"""
+    if deadline is None:
+        return (KODI_CONNECT_TIMEOUT, read)
+    return deadline.timeout(KODI_CONNECT_TIMEOUT, read)
+
+def kodi_post(kodi, payload, label, deadline=None):
+    """
+    POST a JSON-RPC payload to Kodi and return the decoded response.
+    
+    Identical payloads posted concurrently (several displays reloading at once)
+    are coalesced into one HTTP request whose response every caller shares.
+    Raises CircuitOpenError straight away while Kodi is known to be offline.
+    
+    Args:
+        kodi (KodiHost): Kodi to post to
+        payload (dict or list): JSON-RPC request or batch
+        label (str): Name the call is counted under in the coalescing stats
+        deadline (Deadline): Request deadline the call has to fit in, if any
+    """
+    # Raises DeadlineExceeded before Kodi is contacted when the budget is already spent
+    timeout = request_timeout(deadline, KODI_READ_TIMEOUT)
+    
+    def post():
+        # Fail fast while Kodi is known to be offline instead of waiting out the timeout
+        if not kodi.breaker.allow():
+            raise CircuitOpenError(f"Kodi {kodi.name} unavailable")
+        try:
+            r = kodi.session().post(f"{kodi.url}/jsonrpc", headers=HEADERS, json=payload, timeout=timeout)
+        except requests.Timeout:
+            if timeout[1] < KODI_READ_TIMEOUT:
+                # Cut short by the request deadline - says nothing about Kodi's health
+                kodi.breaker.release()
+            else:
+                kodi.breaker.record_failure()
+            raise
+        except Exception:
+            kodi.breaker.record_failure()
+            raise
+        # Any HTTP answer, even an error status, means Kodi is up
+        kodi.breaker.record_success()
+        r.raise_for_status()
+        return r.json()
+    # Joining a call already in flight may not take longer than a call of our own could
+    wait = sum(timeout) if deadline is None else min(sum(timeout), deadline.remaining())
+    try:
+        return rpc_flight.do(f"{kodi.url} {json.dumps(payload, sort_keys=True)}", post, name=label, timeout=wait)
+    except FlightTimeout as e:
+        # Fail the way our own request would have; the breaker is left to the caller still waiting on Kodi
+        raise requests.Timeout(str(e)) from e
+
+def kodi_rpc(kodi, method, params=None, deadline=None):
+    # Library details hardly ever change while an item plays - serve repeats from the cache
+    cache_key = library_cache_key(method, params, library_for(kodi))
+    if cache_key:
+        cached = library_cache.get(cache_key)
+        if cached is not None:
+            print(f"[DEBUG] Library cache hit for {method}", flush=True)
+            return cached
+    
     payload = {
         "jsonrpc": "2.0",
         "method": method,
@@ -219,20 +770,212 @@ def kodi_rpc(method, params=None):
         "id": 1
     }
     try:
-        r = requests.post(f"{KODI_HOST}/jsonrpc", headers=HEADERS, json=payload, auth=AUTH, timeout=8)
-        r.raise_for_status()
-        response_json = r.json()
+        response_json = kodi_post(kodi, payload, method, deadline)
         print(f"[DEBUG] Kodi response for {method}:", response_json, flush=True)
+        if cache_key and response_json.get("result") and not response_json.get("error"):
+            library_cache.put(cache_key, response_json)
         return response_json
+    except CircuitOpenError:
+        print(f"[DEBUG] Kodi unavailable, skipping {method}", flush=True)
+        return None
+    except DeadlineExceeded:
+        print(f"[DEBUG] Deadline passed, skipping {method}", flush=True)
+        return None
     except Exception as e:
         print(f"[ERROR] Kodi RPC failed for method {method}: {e}", flush=True)
         return None
 
+def kodi_rpc_batch(kodi, calls, deadline=None):
+    """
+    Send several JSON-RPC calls to Kodi in a single HTTP round trip.
+    
+    Args:
+        kodi (KodiHost): Kodi to send the calls to
+        calls (list): (method, params) tuples, in the order the responses are wanted
+        deadline (Deadline): Request deadline the batch has to fit in, if any
+        
+    Returns:
+        list: One response per call, in call order. Each entry is the JSON-RPC
+              response for that call (carrying either "result" or "error"), or
+              None when the batch failed or Kodi left the call unanswered.
+    """
+    if not calls:
+        return []
+    
+    # Answer cached library lookups locally and only send the rest
+    responses = [None] * len(calls)
+    cache_keys = [library_cache_key(method, params, library_for(kodi)) for method, params in calls]
+    pending = []
+    for request_id, ((method, params), cache_key) in enumerate(zip(calls, cache_keys)):
+        cached = library_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            print(f"[DEBUG] Library cache hit for {method}", flush=True)
+            responses[request_id] = cached
+        else:
+            pending.append(request_id)
+    if not pending:
+        return responses
+    
+    methods = [calls[request_id][0] for request_id in pending]
+    payload = [
+        {"jsonrpc": "2.0", "method": calls[request_id][0], "params": calls[request_id][1] or {}, "id": request_id}
+        for request_id in pending
+    ]
+    try:
+        response_json = kodi_post(kodi, payload, f"batch({','.join(sorted(set(methods)))})", deadline)
+    except CircuitOpenError:
+        print(f"[DEBUG] Kodi unavailable, skipping batch {methods}", flush=True)
+        return responses
+    except DeadlineExceeded:
+        print(f"[DEBUG] Deadline passed, skipping batch {methods}", flush=True)
+        return responses
+    except Exception as e:
+        print(f"[ERROR] Kodi batch RPC failed for methods {methods}: {e}", flush=True)
+        return responses
+    
+    # Kodi answers a batch with an array, but a malformed batch comes back as a single error object
+    if not isinstance(response_json, list):
+        print(f"[ERROR] Kodi batch RPC rejected for methods {methods}: {response_json}", flush=True)
+        return responses
+    
+    # Responses may arrive in any order, so match them back up by id
+    responses_by_id = {entry.get("id"): entry for entry in response_json if isinstance(entry, dict)}
+    for request_id in pending:
+        method = calls[request_id][0]
+        response = responses_by_id.get(request_id)
+        if response is None:
+            print(f"[ERROR] Kodi batch RPC returned no response for method {method}", flush=True)
+        elif response.get("error"):
+            print(f"[DEBUG] Kodi batch error for {method}: {response.get('error')}", flush=True)
+        else:
+            print(f"[DEBUG] Kodi batch response for {method}:", response, flush=True)
+            if cache_keys[request_id] and response.get("result"):
+                library_cache.put(cache_keys[request_id], response)
+        responses[request_id] = response
+    return responses
+
+# Independent Kodi calls made while rendering run concurrently on this client
+kodi_client = AsyncKodiClient(kodi_rpc, KODI_CONCURRENCY)
+art_client = AsyncKodiClient(kodi_rpc, ART_DOWNLOAD_CONCURRENCY, per_host=ART_DOWNLOADS_PER_HOST, name="art-download")
 
+# Kodi's fixed player ids (audio, video, picture) - queried speculatively so the
+# item and progress can ride in the same batch as Player.GetActivePlayers
+KODI_PLAYER_IDS = (0, 1, 2)
 
-def prepare_and_download_art(item, session_id):
+def fetch_active_players(kodi, item_properties=None, progress_properties=None, deadline=None):
+    """
+    Fetch every active player, its current item and its progress in one round trip.
+    
+    Args:
+        kodi (KodiHost): Kodi to ask
+        item_properties (list): Player.GetItem properties, or None to skip the item
+        progress_properties (list): Player.GetProperties properties, or None to skip progress
+        deadline (Deadline): Request deadline the calls have to fit in, if any
+        
+    Returns:
+        list: {"playerid", "item", "progress"} per active player in Kodi's order,
+              empty when nothing is playing or Kodi could not be reached
+    """
+    calls = [("Player.GetActivePlayers", {})]
+    for player_id in KODI_PLAYER_IDS:
+        if item_properties is not None:
+            calls.append(("Player.GetItem", {"playerid": player_id, "properties": item_properties}))
+        if progress_properties is not None:
+            calls.append(("Player.GetProperties", {"playerid": player_id, "properties": progress_properties}))
+    responses = kodi_rpc_batch(kodi, calls, deadline)
+    
+    active_response = responses[0]
+    active = active_response.get("result") if active_response else None
+    players = []
+    for active_player in active or []:
+        player_id = active_player.get("playerid")
+        
+        # Pick out the speculative calls that were made for this player
+        item_response = None
+        progress_response = None
+        for (method, params), response in zip(calls[1:], responses[1:]):
+            if params.get("playerid") != player_id:
+                continue
+            if method == "Player.GetItem":
+                item_response = response
+            else:
+                progress_response = response
+        
+        # Unexpected player ids fall back to individual calls
+        if player_id not in KODI_PLAYER_IDS:
+            if item_properties is not None:
+                item_response = kodi_rpc(kodi, "Player.GetItem", {"playerid": player_id, "properties": item_properties}, deadline)
+            if progress_properties is not None:
+                progress_response = kodi_rpc(kodi, "Player.GetProperties", {"playerid": player_id, "properties": progress_properties}, deadline)
+        
+        item = item_response.get("result", {}).get("item") if item_response else None
+        progress = progress_response.get("result") if progress_response else None
+        players.append({
+            "playerid": player_id,
+            "item": item,
+            "progress": progress or {}
+        })
+    return players
+
+def fetch_active_player(kodi, item_properties=None, progress_properties=None, deadline=None):
+    """
+    Fetch the first active player, its current item and its progress in one round trip.
+    
+    Returns:
+        dict: {"playerid", "item", "progress"}, or None when nothing is playing or
+              Kodi could not be reached
+    """
+    players = fetch_active_players(kodi, item_properties, progress_properties, deadline)
+    return players[0] if players else None
+
+def session_for(kodi, url):
+    """Pick the pooled session for a URL - only the Kodi's own URLs get its authenticated pool"""
+    if url.startswith(kodi.url):
+        return kodi.session()
+    return get_session(EXTERNAL_POOL)
+
+
+
+def download_image(session, url, source, owner, deadline=None):
+    """
+    Stream one image into the artwork store.
+
+    Args:
+        session (requests.Session): Pooled session to download with
+        url (str): Image URL
+        source (str): Artwork store key for the image
+        owner (str): Who the image is pinned for while shown
+        deadline (Deadline): Overall deadline of the render, if any
+
+    Returns:
+        str: Blob name
+
+    Raises:
+        requests.HTTPError: For an error status, so callers can react to a 401
+        ArtRejected: When the response is not an image or is too big
+    """
+    with session.get(url, timeout=request_timeout(deadline, 5), stream=True) as r:
+        r.raise_for_status()
+        return art_store.put_stream(source, r.iter_content(ART_CHUNK_SIZE), owner,
+                                    content_type=r.headers.get("Content-Type"),
+                                    content_length=r.headers.get("Content-Length"))
+
+def image_missing(error):
+    """True when a failed image download means the file is not there (rather than Kodi being slow or down)"""
+    return (isinstance(error, requests.HTTPError) and error.response is not None
+            and error.response.status_code in (401, 403, 404))
+
+def prepare_and_download_art(kodi, item, deadline=None):
     downloaded = {}
 
+    def art_key(path):
+        """Artwork store key for an art path on this Kodi - shared with other hosts unless the path is local to it"""
+        return art_source(path, library_for(kodi))
+
+    # A new item is being shown: release the previous item's artwork, and pin this
+    # item's as it is found or downloaded (owner=kodi.name) so eviction cannot touch it
+    art_store.pin(kodi.name)
+
     art_map = item.get("art", {})
     if item.get("thumbnail") and not art_map.get("poster"):
         art_map["poster"] = item["thumbnail"]
@@ -280,7 +1023,7 @@ def prepare_and_download_art(item, session_id):
     print(f"[DEBUG] Found fanart variants: {list(fanart_variants.keys())}", flush=True)
     
     # For movies and episodes, try to find additional fanart files in the media folder
-    if item.get("type") in ["movie", "episode"] and item.get("file"):
+    if item.get("type") in ["movie", "episode"] and item.get("file") and not deadline_passed(deadline, "additional fanart scan"):
         current_file = item.get("file", "")
         if current_file.startswith("nfs://"):
             try:
@@ -290,10 +1033,10 @@ def prepare_and_download_art(item, session_id):
                 
                 # Try to list the directory contents using Kodi's Files.GetDirectory API
                 try:
-                    dir_response = kodi_rpc("Files.GetDirectory", {
+                    dir_response = kodi_rpc(kodi, "Files.GetDirectory", {
                         "directory": media_dir,
                         "properties": ["file"]
-                    })
+                    }, deadline=deadline)
                     
                     if dir_response and dir_response.get("result") and not dir_response.get("error"):
                         files = dir_response.get("result", {}).get("files", [])
@@ -311,10 +1054,10 @@ def prepare_and_download_art(item, session_id):
                                     
                                     # Scan the extrafanart directory
                                     try:
-                                        extrafanart_response = kodi_rpc("Files.GetDirectory", {
+                                        extrafanart_response = kodi_rpc(kodi, "Files.GetDirectory", {
                                             "directory": file_path,
                                             "properties": ["file"]
-                                        })
+                                        }, deadline=deadline)
                                         
                                         if extrafanart_response and extrafanart_response.get("result") and not extrafanart_response.get("error"):
                                             extrafanart_files = extrafanart_response.get("result", {}).get("files", [])
@@ -373,7 +1116,7 @@ def prepare_and_download_art(item, session_id):
                     
                     # Fallback: try to find fanart1, fanart2, etc. by testing individual files
                     print(f"[DEBUG] Falling back to individual file testing", flush=True)
-                    for i in range(1, 10):  # fanart1 through fanart9
+                    async def probe_fanart(i):
                         fanart_filename = f"fanart{i}.jpg"
                         fanart_path = f"{media_dir}/{fanart_filename}"
                         
@@ -381,7 +1124,7 @@ def prepare_and_download_art(item, session_id):
                         
                         # Try to access the file directly through Kodi's HTTP interface
                         try:
-                            response = kodi_rpc("Files.PrepareDownload", {"path": fanart_path})
+                            response = await kodi_client.rpc(kodi, "Files.PrepareDownload", {"path": fanart_path}, deadline)
                             if response and response.get("result") and not response.get("error"):
                                 details = response.get("result", {}).get("details", {})
                                 token = details.get("token")
@@ -389,38 +1132,50 @@ def prepare_and_download_art(item, session_id):
                                 
                                 if token:
                                     basename = os.path.basename(fanart_path)
-                                    image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
+                                    image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
                                     # Test if the image actually exists
                                     try:
-                                        test_response = requests.head(image_url, auth=AUTH, timeout=3)
+                                        test_response = await kodi_client.call(lambda: kodi.session().head(image_url, timeout=request_timeout(deadline, 3)))
                                         if test_response.status_code == 200:
-                                            fanart_variants[f"fanart{i}"] = fanart_path
                                             print(f"[DEBUG] Found additional fanart: fanart{i} at {fanart_path}", flush=True)
+                                            return fanart_path
                                     except Exception as test_e:
                                         print(f"[DEBUG] Test request failed for fanart{i}: {test_e}", flush=True)
                                 elif path:
                                     # Test if the image actually exists
                                     try:
-                                        test_response = requests.head(f"{KODI_HOST}/{path}", auth=AUTH, timeout=3)
+                                        test_response = await kodi_client.call(lambda: kodi.session().head(f"{kodi.url}/{path}", timeout=request_timeout(deadline, 3)))
                                         if test_response.status_code == 200:
-                                            fanart_variants[f"fanart{i}"] = fanart_path
                                             print(f"[DEBUG] Found additional fanart: fanart{i} at {fanart_path}", flush=True)
+                                            return fanart_path
                                     except Exception as test_e:
                                         print(f"[DEBUG] Test request failed for fanart{i}: {test_e}", flush=True)
                         except Exception as e:
                             print(f"[DEBUG] Failed to check fanart{i}: {e}", flush=True)
-                            pass
+                        return None
+
+                    # Probe all nine candidates at once, keeping fanart1..9 order for the slideshow
+                    probes = kodi_client.run(kodi_client.gather(*(probe_fanart(i) for i in range(1, 10))))
+                    for i, fanart_path in enumerate(probes, start=1):
+                        if fanart_path and not isinstance(fanart_path, Exception):
+                            fanart_variants[f"fanart{i}"] = fanart_path
                         
             except Exception as e:
                 print(f"[DEBUG] Failed to scan for additional fanart: {e}", flush=True)
     
     print(f"[DEBUG] Total fanart variants found: {list(fanart_variants.keys())}", flush=True)
 
-    for art_type in ART_TYPES:
+    # Fallback path each art type was resolved to, recorded as found or missing once its download is over
+    fallback_picks = {}
+
+    async def resolve_art_url(art_type):
+        """Download URL for one art type - Kodi-local paths need a Files.PrepareDownload first"""
+        if deadline_passed(deadline, f"resolving {art_type}"):
+            return None
         raw_path = art_map.get(art_type)
         print(f"[DEBUG] Processing art_type: {art_type}, raw_path: {raw_path}", flush=True)
         if not raw_path:
-            continue
+            return None
 
         if raw_path and raw_path.startswith("image://"):
             raw_path = urllib.parse.unquote(raw_path[len("image://"):])
@@ -435,7 +1190,7 @@ def prepare_and_download_art(item, session_id):
             image_url = None
             try:
                 if raw_path:
-                    response = kodi_rpc("Files.PrepareDownload", {"path": raw_path})
+                    response = await kodi_client.rpc(kodi, "Files.PrepareDownload", {"path": raw_path}, deadline)
                 else:
                     response = None
                 details = response.get("result", {}).get("details", {}) if response else {}
@@ -444,16 +1199,16 @@ def prepare_and_download_art(item, session_id):
 
                 if token and raw_path:
                     basename = os.path.basename(raw_path)
-                    image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
+                    image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
                 elif path:
-                    image_url = f"{KODI_HOST}/{path}"
+                    image_url = f"{kodi.url}/{path}"
                 else:
                     print(f"[ERROR] No valid download path for {art_type}", flush=True)
             except Exception as e:
                 print(f"[WARNING] Failed to prepare download for {art_type}: {e}", flush=True)
             
             # If primary path failed, try fallback paths for artist artwork
-            if not image_url and art_type in ["fanart", "clearlogo", "clearart", "banner"]:
+            if not image_url and art_type in ["fanart", "clearlogo", "clearart", "banner"] and not deadline_passed(deadline, f"fallback paths for {art_type}"):
                 print(f"[DEBUG] Primary path failed, trying fallback paths for {art_type}", flush=True)
                 # Try to construct fallback paths based on album/artist folder structure
                 current_file = item.get("file", "")
@@ -539,24 +1294,30 @@ def prepare_and_download_art(item, session_id):
                             
                             current_path = parent_path
                         
-                        # Try each fallback path
-                        for fallback_path in fallback_paths:
+                        # Try each fallback path, known-good first and known-missing not at all
+                        source = art_key(art_map.get(art_type))
+                        for fallback_path in fallback_cache.order(source, fallback_paths, art_key):
+                            if deadline_passed(deadline, f"remaining fallback paths for {art_type}"):
+                                break
                             try:
                                 print(f"[DEBUG] Trying fallback path: {fallback_path}")
-                                response = kodi_rpc("Files.PrepareDownload", {"path": fallback_path})
+                                response = await kodi_client.rpc(kodi, "Files.PrepareDownload", {"path": fallback_path}, deadline)
                                 details = response.get("result", {}).get("details", {})
                                 token = details.get("token")
                                 path = details.get("path")
                                 
                                 if token:
                                     basename = os.path.basename(fallback_path)
-                                    image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
+                                    image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
                                     print(f"[DEBUG] Found fallback path for {art_type}: {image_url}")
+                                    fallback_picks[art_type] = (source, fallback_path)
                                     break
                                 elif path:
-                                    image_url = f"{KODI_HOST}/{path}"
+                                    image_url = f"{kodi.url}/{path}"
                                     print(f"[DEBUG] Found fallback path for {art_type}: {image_url}")
+                                    fallback_picks[art_type] = (source, fallback_path)
                                     break
+                                fallback_cache.missing(source, fallback_path, art_key(fallback_path))
                             except Exception as e:
                                 print(f"[DEBUG] Fallback path failed for {art_type}: {e}")
                                 pass
@@ -565,29 +1326,74 @@ def prepare_and_download_art(item, session_id):
             
             if not image_url:
                 print(f"[ERROR] No valid download path found for {art_type}", flush=True)
-                continue
+                return None
+        return image_url
 
-        filename = f"{session_id}_{art_type}.jpg"
-        local_path = f"/tmp/{filename}"
+    def collect_art(sources, download, host=None):
+        """
+        Run download(key, source) for every entry on the artwork pool, at most
+        ART_DOWNLOADS_PER_HOST at a time per image host.
 
+        Args:
+            sources (dict): Art key -> URL (or Kodi path when host is given)
+            download (callable): download(key, source) -> blob or None
+            host (str): Image host for every source, instead of each URL's own
+
+        Returns:
+            dict: Art key -> blob for every successful download
+        """
+        fetches = [art_client.fetch(host or urllib.parse.urlparse(source).netloc, download, key, source)
+                   for key, source in sources.items()]
+        blobs = {}
+        for key, blob in zip(sources, art_client.run(art_client.gather(*fetches))):
+            if isinstance(blob, Exception):
+                print(f"[ERROR] Failed to download {key}: {blob}", flush=True)
+            elif blob:
+                blobs[key] = blob
+        return blobs
+
+    def record_art(keys, blobs):
+        """Add blobs to downloaded in the order of keys, whichever were stored already and whichever just arrived"""
+        for key in keys:
+            if key in blobs:
+                downloaded[key] = blobs[key]
+
+    # Art already in the store needs neither a PrepareDownload nor a download
+    missing = []
+    art_blobs = {}
+    for art_type in ART_TYPES:
+        blob = art_store.lookup(art_key(art_map.get(art_type)), kodi.name)
+        if blob:
+            art_blobs[art_type] = blob
+        else:
+            missing.append(art_type)
+    if len(missing) < len(ART_TYPES):
+        print(f"[DEBUG] Artwork store had {len(ART_TYPES) - len(missing)} of the art types, resolving {missing}", flush=True)
+
+    def download_art(art_type, image_url):
+        """Download one resolved art type, falling back to folder art on a 401. Returns the blob or None"""
+        if deadline_passed(deadline, f"downloading {art_type}"):
+            return None
         try:
             # Use authentication only for Kodi internal URLs
-            if image_url.startswith(KODI_HOST):
+            if image_url.startswith(kodi.url):
                 print(f"[DEBUG] Downloading with auth: {image_url}", flush=True)
-                r = requests.get(image_url, auth=AUTH, timeout=5)
             else:
                 print(f"[DEBUG] Downloading without auth: {image_url}", flush=True)
-                r = requests.get(image_url, timeout=5)
-            r.raise_for_status()
-            with open(local_path, "wb") as f:
-                f.write(r.content)
-            downloaded[art_type] = filename
-            print(f"[INFO] Downloaded {art_type} to {local_path}", flush=True)
+            blob = download_image(session_for(kodi, image_url), image_url, art_key(art_map.get(art_type)), kodi.name, deadline)
+            print(f"[INFO] Downloaded {art_type} as {blob}", flush=True)
+            # PrepareDownload hands out a URL without checking the file, so only now is the fallback known good
+            if art_type in fallback_picks:
+                fallback_cache.found(*fallback_picks[art_type])
+            return blob
         except Exception as e:
             print(f"[ERROR] Failed to download {art_type}: {e}", flush=True)
+            if art_type in fallback_picks and image_missing(e):
+                source, fallback_path = fallback_picks[art_type]
+                fallback_cache.missing(source, fallback_path, art_key(fallback_path))
             
             # If download failed with 401, try fallback paths for artist artwork
-            if "401" in str(e) and art_type in ["fanart", "clearlogo", "clearart", "banner"]:
+            if "401" in str(e) and art_type in ["fanart", "clearlogo", "clearart", "banner"] and not deadline_passed(deadline, f"fallback paths for {art_type}"):
                 print(f"[DEBUG] Download failed with 401, trying fallback paths for {art_type}", flush=True)
                 # Try to construct fallback paths based on album/artist folder structure
                 current_file = item.get("file", "")
@@ -673,214 +1479,231 @@ def prepare_and_download_art(item, session_id):
                             
                             current_path = parent_path
                         
-                        # Try each fallback path
-                        for fallback_path in fallback_paths:
+                        # Try each fallback path, known-good first and known-missing not at all
+                        source = art_key(art_map.get(art_type))
+                        for fallback_path in fallback_cache.order(source, fallback_paths, art_key):
+                            if deadline_passed(deadline, f"remaining fallback paths for {art_type}"):
+                                break
                             try:
                                 print(f"[DEBUG] Trying fallback path: {fallback_path}")
-                                response = kodi_rpc("Files.PrepareDownload", {"path": fallback_path})
+                                response = kodi_rpc(kodi, "Files.PrepareDownload", {"path": fallback_path}, deadline=deadline)
                                 details = response.get("result", {}).get("details", {})
                                 token = details.get("token")
                                 path = details.get("path")
                                 
                                 if token:
                                     basename = os.path.basename(fallback_path)
-                                    fallback_image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
+                                    fallback_image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
                                 elif path:
-                                    fallback_image_url = f"{KODI_HOST}/{path}"
+                                    fallback_image_url = f"{kodi.url}/{path}"
                                 else:
-                                    pass
+                                    fallback_cache.missing(source, fallback_path, art_key(fallback_path))
+                                    continue
                                 
                                 # Try to download the fallback image
                                 print(f"[DEBUG] Trying to download fallback: {fallback_image_url}")
-                                r = requests.get(fallback_image_url, auth=AUTH, timeout=5)
-                                r.raise_for_status()
-                                with open(local_path, "wb") as f:
-                                    f.write(r.content)
-                                downloaded[art_type] = filename
-                                print(f"[INFO] Downloaded {art_type} from fallback path to {local_path}")
-                                break  # Success, stop trying other fallback paths
+                                # Indexed under the original art path, so the next render skips the fallback hunt
+                                blob = download_image(kodi.session(), fallback_image_url, source, kodi.name, deadline)
+                                print(f"[INFO] Downloaded {art_type} from fallback path as {blob}")
+                                fallback_cache.found(source, fallback_path)
+                                return blob  # Success, stop trying other fallback paths
                             except Exception as fallback_e:
                                 print(f"[DEBUG] Fallback path failed for {art_type}: {fallback_e}")
-                                pass
+                                if image_missing(fallback_e):
+                                    fallback_cache.missing(source, fallback_path, art_key(fallback_path))
                     except Exception as fallback_construct_e:
                         print(f"[DEBUG] Failed to construct fallback paths for {art_type}: {fallback_construct_e}")
+        return None
 
-    # Process fanart variants for slideshow
-    if len(fanart_variants) > 1:
-        print(f"[DEBUG] Processing {len(fanart_variants)} fanart variants for slideshow", flush=True)
-        
-        # Download additional fanart variants
-        for variant_key, variant_path in fanart_variants.items():
-            if variant_key == "fanart":
-                continue  # Skip the main fanart as it's already processed
+    # Resolve every missing art type at once, then download them all on the artwork pool
+    resolved = kodi_client.run(kodi_client.gather(*(resolve_art_url(art_type) for art_type in missing)))
+    downloads = {}
+    for art_type, image_url in zip(missing, resolved):
+        if isinstance(image_url, Exception):
+            print(f"[WARNING] Failed to resolve {art_type}: {image_url}", flush=True)
+        elif image_url:
+            downloads[art_type] = image_url
+    art_blobs.update(collect_art(downloads, download_art))
+    record_art(ART_TYPES, art_blobs)
+
+    def download_variant(variant_key, variant_path):
+        """Download one extra fanart for the slideshow. Returns the blob or None"""
+        if deadline_passed(deadline, f"fanart variant {variant_key}"):
+            return None
+        blob = None
+        try:
+            # Prepare download for this fanart variant
+            # Handle different path formats
+            if variant_path.startswith("image://"):
+                print(f"[DEBUG] Processing fanart variant {variant_key}: {variant_path}", flush=True)
                 
-            try:
-                # Prepare download for this fanart variant
-                # Handle different path formats
-                if variant_path.startswith("image://"):
-                    print(f"[DEBUG] Processing fanart variant {variant_key}: {variant_path}", flush=True)
+                # Handle artist information paths with fallback logic
+                if "ArtistInformation" in variant_path:
+                    print(f"[DEBUG] Processing artist information path for {variant_key}: {variant_path}", flush=True)
                     
-                    # Handle artist information paths with fallback logic
-                    if "ArtistInformation" in variant_path:
-                        print(f"[DEBUG] Processing artist information path for {variant_key}: {variant_path}", flush=True)
-                        
-                        # Extract the artist name and filename from the path
-                        original_path = urllib.parse.unquote(variant_path[len("image://"):])
-                        if original_path.endswith("/"):
-                            original_path = original_path[:-1]
+                    # Extract the artist name and filename from the path
+                    original_path = urllib.parse.unquote(variant_path[len("image://"):])
+                    if original_path.endswith("/"):
+                        original_path = original_path[:-1]
+                    
+                    # Extract artist name from path like U:\Kodi\ArtistInformation\AURORA\fanart1.jpg
+                    path_parts = original_path.split("\\")
+                    if len(path_parts) >= 4:
+                        artist_name = path_parts[3]  # AURORA
+                        filename = path_parts[-1]    # fanart1.jpg
                         
-                        # Extract artist name from path like U:\Kodi\ArtistInformation\AURORA\fanart1.jpg
-                        path_parts = original_path.split("\\")
-                        if len(path_parts) >= 4:
-                            artist_name = path_parts[3]  # AURORA
-                            filename = path_parts[-1]    # fanart1.jpg
-                            
-                            # Get the artist folder path from the current file
-                            current_file = item.get("file", "")
-                            if current_file.startswith("nfs://"):
-                                file_parts = current_file.split("/")
-                                if "Music" in file_parts:
-                                    music_index = file_parts.index("Music")
-                                    if music_index + 1 < len(file_parts):
-                                        artist_folder = file_parts[music_index + 1]
-                                        
-                                        # Try multiple fallback paths with different formats
-                                        fallback_paths = []
-                                        
-                                        # 1. Try direct artist folder path with original extension
-                                        fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/{filename}")
-                                        
-                                        # 2. Try different file extensions (jpg, jpeg, png)
-                                        base_filename = filename.rsplit('.', 1)[0] if '.' in filename else filename
-                                        for ext in ['jpg', 'jpeg', 'png']:
-                                            fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/{base_filename}.{ext}")
-                                        
-                                        # 3. Try extrafanart folder with original extension
-                                        fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/extrafanart/{filename}")
-                                        
-                                        # 4. Try extrafanart folder with different extensions
-                                        for ext in ['jpg', 'jpeg', 'png']:
-                                            fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/extrafanart/{base_filename}.{ext}")
+                        # Get the artist folder path from the current file
+                        current_file = item.get("file", "")
+                        if current_file.startswith("nfs://"):
+                            file_parts = current_file.split("/")
+                            if "Music" in file_parts:
+                                music_index = file_parts.index("Music")
+                                if music_index + 1 < len(file_parts):
+                                    artist_folder = file_parts[music_index + 1]
+                                    
+                                    # Try multiple fallback paths with different formats
+                                    fallback_paths = []
+                                    
+                                    # 1. Try direct artist folder path with original extension
+                                    fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/{filename}")
+                                    
+                                    # 2. Try different file extensions (jpg, jpeg, png)
+                                    base_filename = filename.rsplit('.', 1)[0] if '.' in filename else filename
+                                    for ext in ['jpg', 'jpeg', 'png']:
+                                        fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/{base_filename}.{ext}")
+                                    
+                                    # 3. Try extrafanart folder with original extension
+                                    fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/extrafanart/{filename}")
+                                    
+                                    # 4. Try extrafanart folder with different extensions
+                                    for ext in ['jpg', 'jpeg', 'png']:
+                                        fallback_paths.append(f"nfs://192.168.0.111/Media/Music/{artist_folder}/extrafanart/{base_filename}.{ext}")
+                                    
+                                    # Try each fallback path, known-good first and known-missing not at all
+                                    source = art_key(variant_path)
+                                    for fallback_path in fallback_cache.order(source, fallback_paths, art_key):
+                                        image_protocol_path = f"image://{urllib.parse.quote(fallback_path, safe='')}/"
+                                        print(f"[DEBUG] Trying fallback path: {image_protocol_path}", flush=True)
                                         
-                                        # Try each fallback path
-                                        for fallback_path in fallback_paths:
-                                            image_protocol_path = f"image://{urllib.parse.quote(fallback_path, safe='')}/"
-                                            print(f"[DEBUG] Trying fallback path: {image_protocol_path}", flush=True)
+                                        response = kodi_rpc(kodi, "Files.PrepareDownload", {"path": image_protocol_path}, deadline=deadline)
+                                        if response and response.get("result") and not response.get("error"):
+                                            details = response.get("result", {}).get("details", {})
+                                            token = details.get("token")
+                                            path = details.get("path")
                                             
-                                            response = kodi_rpc("Files.PrepareDownload", {"path": image_protocol_path})
-                                            if response and response.get("result") and not response.get("error"):
-                                                details = response.get("result", {}).get("details", {})
-                                                token = details.get("token")
-                                                path = details.get("path")
-                                                
-                                                if token:
-                                                    basename = os.path.basename(fallback_path)
-                                                    image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
-                                                elif path:
-                                                    image_url = f"{KODI_HOST}/{path}"
-                                                else:
-                                                    continue
-                                                
-                                                # Download the fanart variant
-                                                filename_local = f"{session_id}_{variant_key}.jpg"
-                                                local_path = f"/tmp/{filename_local}"
-                                                
-                                                try:
-                                                    r = requests.get(image_url, auth=AUTH, timeout=5)
-                                                    r.raise_for_status()
-                                                    with open(local_path, "wb") as f:
-                                                        f.write(r.content)
-                                                    downloaded[variant_key] = filename_local
-                                                    print(f"[INFO] Downloaded {variant_key} from fallback path to {local_path}", flush=True)
-                                                    break  # Success, exit fallback loop
-                                                except Exception as e:
-                                                    print(f"[DEBUG] Failed to download from fallback path: {e}", flush=True)
-                                                    continue
+                                            if token:
+                                                basename = os.path.basename(fallback_path)
+                                                image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
+                                            elif path:
+                                                image_url = f"{kodi.url}/{path}"
                                             else:
-                                                print(f"[DEBUG] Fallback path failed: {image_protocol_path}", flush=True)
-                                    else:
-                                        print(f"[DEBUG] Could not find artist folder in current file path", flush=True)
+                                                fallback_cache.missing(source, fallback_path, art_key(fallback_path))
+                                                continue
+                                            
+                                            # Download the fanart variant
+                                            try:
+                                                blob = download_image(kodi.session(), image_url, source, kodi.name, deadline)
+                                                print(f"[INFO] Downloaded {variant_key} from fallback path as {blob}", flush=True)
+                                                fallback_cache.found(source, fallback_path)
+                                                break  # Success, exit fallback loop
+                                            except Exception as e:
+                                                print(f"[DEBUG] Failed to download from fallback path: {e}", flush=True)
+                                                if image_missing(e):
+                                                    fallback_cache.missing(source, fallback_path, art_key(fallback_path))
+                                                continue
+                                        else:
+                                            print(f"[DEBUG] Fallback path failed: {image_protocol_path}", flush=True)
+                                            if response:
+                                                fallback_cache.missing(source, fallback_path, art_key(fallback_path))
                                 else:
-                                    print(f"[DEBUG] Could not find Music in current file path", flush=True)
+                                    print(f"[DEBUG] Could not find artist folder in current file path", flush=True)
                             else:
-                                print(f"[DEBUG] Current file is not an NFS path", flush=True)
+                                print(f"[DEBUG] Could not find Music in current file path", flush=True)
                         else:
-                            print(f"[DEBUG] Could not parse artist information path: {original_path}", flush=True)
+                            print(f"[DEBUG] Current file is not an NFS path", flush=True)
+                    else:
+                        print(f"[DEBUG] Could not parse artist information path: {original_path}", flush=True)
+                
+                # Standard image protocol path handling
+                response = kodi_rpc(kodi, "Files.PrepareDownload", {"path": variant_path}, deadline=deadline)
+                if response and response.get("result") and not response.get("error"):
+                    details = response.get("result", {}).get("details", {})
+                    token = details.get("token")
+                    path = details.get("path")
                     
-                    # Standard image protocol path handling
-                    response = kodi_rpc("Files.PrepareDownload", {"path": variant_path})
-                    if response and response.get("result") and not response.get("error"):
-                        details = response.get("result", {}).get("details", {})
-                        token = details.get("token")
-                        path = details.get("path")
-                        
-                        if token:
-                            # Extract the original path from the image:// protocol
-                            original_path = urllib.parse.unquote(variant_path[len("image://"):])
-                            if original_path.endswith("/"):
-                                original_path = original_path[:-1]
-                            basename = os.path.basename(original_path)
-                            image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
-                        elif path:
-                            image_url = f"{KODI_HOST}/{path}"
-                        else:
-                            continue
-                        
-                        # Download the fanart variant
-                        filename = f"{session_id}_{variant_key}.jpg"
-                        local_path = f"/tmp/{filename}"
-                        
-                        try:
-                            r = requests.get(image_url, auth=AUTH, timeout=5)
-                            r.raise_for_status()
-                            with open(local_path, "wb") as f:
-                                f.write(r.content)
-                            downloaded[variant_key] = filename
-                            print(f"[INFO] Downloaded {variant_key} to {local_path}", flush=True)
-                        except Exception as e:
-                            print(f"[ERROR] Failed to download {variant_key}: {e}", flush=True)
+                    if token:
+                        # Extract the original path from the image:// protocol
+                        original_path = urllib.parse.unquote(variant_path[len("image://"):])
+                        if original_path.endswith("/"):
+                            original_path = original_path[:-1]
+                        basename = os.path.basename(original_path)
+                        image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
+                    elif path:
+                        image_url = f"{kodi.url}/{path}"
                     else:
-                        print(f"[DEBUG] Failed to prepare download for {variant_key}: {response}", flush=True)
-                elif variant_path.startswith("nfs://"):
-                    # Direct NFS path
-                    response = kodi_rpc("Files.PrepareDownload", {"path": variant_path})
-                    if response and response.get("result") and not response.get("error"):
-                        details = response.get("result", {}).get("details", {})
-                        token = details.get("token")
-                        path = details.get("path")
-                        
-                        if token:
-                            basename = os.path.basename(variant_path)
-                            image_url = f"{KODI_HOST}/vfs/{token}/{urllib.parse.quote(basename)}"
-                        elif path:
-                            image_url = f"{KODI_HOST}/{path}"
-                        else:
-                            continue
-                        
-                        # Download the fanart variant
-                        filename = f"{session_id}_{variant_key}.jpg"
-                        local_path = f"/tmp/{filename}"
+                        return blob
+                    
+                    # Download the fanart variant
+                    try:
+                        blob = download_image(kodi.session(), image_url, art_key(variant_path), kodi.name, deadline)
+                        print(f"[INFO] Downloaded {variant_key} as {blob}", flush=True)
+                    except Exception as e:
+                        print(f"[ERROR] Failed to download {variant_key}: {e}", flush=True)
+                else:
+                    print(f"[DEBUG] Failed to prepare download for {variant_key}: {response}", flush=True)
+            elif variant_path.startswith("nfs://"):
+                # Direct NFS path
+                response = kodi_rpc(kodi, "Files.PrepareDownload", {"path": variant_path}, deadline=deadline)
+                if response and response.get("result") and not response.get("error"):
+                    details = response.get("result", {}).get("details", {})
+                    token = details.get("token")
+                    path = details.get("path")
+                    
+                    if token:
+                        basename = os.path.basename(variant_path)
+                        image_url = f"{kodi.url}/vfs/{token}/{urllib.parse.quote(basename)}"
+                    elif path:
+                        image_url = f"{kodi.url}/{path}"
+                    else:
+                        return blob
+                    
+                    # Download the fanart variant
+                    try:
+                        blob = download_image(kodi.session(), image_url, art_key(variant_path), kodi.name, deadline)
+                        print(f"[INFO] Downloaded {variant_key} as {blob}", flush=True)
+                    except Exception as e:
+                        print(f"[ERROR] Failed to download {variant_key}: {e}", flush=True)
                         
-                        try:
-                            r = requests.get(image_url, auth=AUTH, timeout=5)
-                            r.raise_for_status()
-                            with open(local_path, "wb") as f:
-                                f.write(r.content)
-                            downloaded[variant_key] = filename
-                            print(f"[INFO] Downloaded {variant_key} to {local_path}", flush=True)
-                        except Exception as e:
-                            print(f"[ERROR] Failed to download {variant_key}: {e}", flush=True)
-                            
-            except Exception as e:
-                print(f"[ERROR] Failed to process fanart variant {variant_key}: {e}", flush=True)
+        except Exception as e:
+            print(f"[ERROR] Failed to process fanart variant {variant_key}: {e}", flush=True)
+        return blob
+
+    # Process fanart variants for slideshow
+    if len(fanart_variants) > 1 and not deadline_passed(deadline, "fanart variants for slideshow"):
+        print(f"[DEBUG] Processing {len(fanart_variants)} fanart variants for slideshow", flush=True)
+        
+        # Download additional fanart variants, skipping the main fanart as it's already processed
+        variants = {}
+        variant_blobs = {}
+        for variant_key, variant_path in fanart_variants.items():
+            if variant_key == "fanart":
+                continue
+            blob = art_store.lookup(art_key(variant_path), kodi.name)
+            if blob:
+                variant_blobs[variant_key] = blob
+            else:
+                variants[variant_key] = variant_path
+        variant_blobs.update(collect_art(variants, download_variant, host=urllib.parse.urlparse(kodi.url).netloc))
+        record_art([key for key in fanart_variants if key != "fanart"], variant_blobs)
     
+    fallback_cache.save()
     return downloaded
 
-@app.route("/media/<filename>")
-def serve_image(filename):
-    path = f"/tmp/{filename}"
-    if os.path.exists(path):
-        return send_file(path, mimetype="image/jpeg")
+@app.route("/art/<blob>")
+def serve_art(blob):
+    # Blob names are content hashes, so a URL always means the same image
+    if BLOB_PATTERN.match(blob) and os.path.exists(art_store.path(blob)):
+        return send_file(art_store.path(blob), mimetype=blob_content_type(blob), max_age=ART_MAX_AGE)
     return "Image not found", 404
 
 @app.route("/play-button.png")
@@ -930,20 +1753,70 @@ def favicon():
         print(f"[ERROR] Favicon route error: {e}", flush=True)
         return "Favicon error", 500
 
+# Runtime counters for monitoring connection reuse and friends
+@app.route("/stats")
+def stats():
+    return jsonify({
+        "http_pools": pool_stats(),
+        "kodi_hosts": {
+            kodi.name: {
+                "url": kodi.url,
+                "breaker": kodi.breaker.stats(),
+                "notifications_connected": kodi.listener.connected,
+                "clients": kodi.clients.stats(),
+                "idle_backoff": kodi.idle.stats(),
+                "playback_poller": kodi.poller.stats()
+            }
+            for kodi in KODI_HOSTS
+        },
+        "rpc_coalescing": rpc_flight.stats(),
+        "library_cache": library_cache.stats(),
+        "art_store": art_store.stats(),
+        "art_fallback_paths": fallback_cache.stats(),
+        "kodi_async": kodi_client.stats(),
+        "art_downloads": art_client.stats(),
+        "player_store": player_store.stats()
+    })
+
+# Manual purge of cached library details, e.g. after editing metadata outside Kodi
+@app.route("/cache/purge", methods=["POST"])
+def purge_cache():
+    purged = library_cache.purge()
+    print(f"[INFO] Library cache purged ({purged} entries)", flush=True)
+    return jsonify({"purged": purged})
+
 
 @app.route("/nowplaying")
-def now_playing():
+@app.route("/nowplaying/<host>")
+def now_playing(host=None):
+    kodi = kodi_for(host)
+    kodi.clients.poll(request.remote_addr)
     if request.args.get("json") == "1":
-        active_response = kodi_rpc("Player.GetActivePlayers")
-        active = active_response.get("result") if active_response else None
-        if not active:
+        if kodi.poller.running:
+            state = kodi.poller.snapshot()
+            elapsed = int(state.elapsed())
+            
+            def build():
+                if not state.playing:
+                    return {"elapsed": 0, "duration": 0, "paused": True, "version": state.version}
+                return {
+                    "elapsed": elapsed,
+                    "duration": int(state.totaltime),
+                    "paused": state.paused,
+                    "version": state.version
+                }
+            # Between changes clients extrapolate the position themselves, so the same
+            # version only needs a fresh body every RESYNC_ETAG_SECONDS
+            etag = f"{STATE_EPOCH}-{state.version}-{elapsed // RESYNC_ETAG_SECONDS}"
+            return conditional_json(etag, build)
+        if not kodi.idle.due():
             return jsonify({"elapsed": 0, "duration": 0, "paused": True})
-        player_id = active[0]["playerid"]
-        progress_response = kodi_rpc("Player.GetProperties", {
-            "playerid": player_id,
-            "properties": ["time", "totaltime", "speed"]
-        })
-        progress = progress_response.get("result") if progress_response else {}
+        player = fetch_active_player(kodi, progress_properties=["time", "totaltime", "speed"])
+        if not player:
+            kodi.idle.stopped()
+            return jsonify({"elapsed": 0, "duration": 0, "paused": True})
+        kodi.idle.reset()
+        progress = player["progress"]
         t = progress.get("time", {})
         d = progress.get("totaltime", {})
         speed = progress.get("speed", 0)
@@ -954,11 +1827,26 @@ def now_playing():
             "paused": speed == 0
         })
 
-    # Get active players - this is critical, so if it fails, show error
+    # A page load is someone looking - check Kodi at the normal rate again
+    kodi.poller.wake()
+    
+    # Everything below shares one time budget; optional work is dropped once it runs out
+    deadline = Deadline(NOWPLAYING_DEADLINE)
+    
+    # Get active player, current item and progress in one round trip - this is critical, so if it fails, show error
     try:
-        active_response = kodi_rpc("Player.GetActivePlayers")
-        active = active_response.get("result") if active_response else None
-        if not active:
+        player = fetch_active_player(
+            kodi,
+            item_properties=[
+                "title", "album", "artist", "season", "episode", "showtitle",
+                    "tvshowid", "duration", "file", "director", "art", "plot", 
+                    "cast", "resume", "genre", "rating", "streamdetails", "year",
+                    "albumid", "artistid"
+            ],
+            progress_properties=["time", "totaltime", "speed"],
+            deadline=deadline
+        )
+        if not player:
             return render_template_string("""
             <html>
             <head>
@@ -986,21 +1874,75 @@ def now_playing():
               <script>
                 let lastPlaybackState = false; // Initialize to false
 
+                function handlePlaybackState(data) {
+                  const currentState = data.playing;
+                  if (currentState !== lastPlaybackState) {
+                    document.body.classList.add('fade-out');
+                    setTimeout(() => {
+                       location.reload(true);
+                    }, 800);
+                  }
+                  lastPlaybackState = currentState;
+                }
+
+                // ETag of the last answer - an unchanged state comes back as an empty 304
+                let pollEtag = null;
+                // How long to wait before the next poll - the server adjusts it to what is playing
+                let nextPollMs = 5000;
+
                 function checkPlaybackChange() {
-                  fetch('/poll_playback')
-                    .then(res => res.json())
+                  return fetch('/state{{ host_path }}', { headers: pollEtag ? { 'If-None-Match': pollEtag } : {} })
+                    .then(res => {
+                      if (res.status === 304) return null;
+                      pollEtag = res.headers.get('ETag');
+                      return res.json();
+                    })
                     .then(data => {
-                      const currentState = data.playing;
-                      if (currentState !== lastPlaybackState) {
-                        document.body.classList.add('fade-out');
-                        setTimeout(() => {
-                           location.reload(true);
-                        }, 800);
-                      }
-                      lastPlaybackState = currentState;
-                    });
+                      if (!data) return;
+                      if (data.next_poll_ms) nextPollMs = data.next_poll_ms;
+                      handlePlaybackState(data);
+                    })
+                    .catch(error => console.error('Polling error:', error));
+                }
+
+                // Wait for playback to start over /events, polling only without it
+                let pollTimer = null;
+                function startPolling() {
+                  if (!pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+                }
+                function pollState() {
+                  checkPlaybackChange().finally(() => {
+                    if (pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+                  });
+                }
+                function stopPolling() {
+                  clearTimeout(pollTimer);
+                  pollTimer = null;
                 }
-                setInterval(checkPlaybackChange, 5000); // Poll every 5 seconds
+                let events = null;
+                function listenForPlaybackEvents() {
+                  if (!window.EventSource) {
+                    startPolling();
+                    return;
+                  }
+                  events = new EventSource('/events{{ host_path }}');
+                  events.onopen = stopPolling;
+                  events.onerror = startPolling;
+                  events.onmessage = (event) => handlePlaybackState(JSON.parse(event.data));
+                }
+                // A hidden tab stops waiting for playback, so it does not keep the server polling Kodi
+                document.addEventListener('visibilitychange', () => {
+                  if (document.hidden) {
+                    if (events) events.close();
+                    events = null;
+                    stopPolling();
+                    return;
+                  }
+                  pollEtag = null;
+                  checkPlaybackChange();
+                  listenForPlaybackEvents();
+                });
+                listenForPlaybackEvents();
               </script>
             </head>
             <body>
@@ -1009,29 +1951,20 @@ def now_playing():
               </div>
             </body>
             </html>
-            """)
+            """, host_path=f"/{host}" if host else "")
 
-        player_id = active[0]["playerid"]
-        
-        # Get current item - this is critical, so if it fails, show error
-        try:
-            item_response = kodi_rpc("Player.GetItem", {
-                "playerid": player_id,
-                "properties": [
-                    "title", "album", "artist", "season", "episode", "showtitle",
-                        "tvshowid", "duration", "file", "director", "art", "plot", 
-                        "cast", "resume", "genre", "rating", "streamdetails", "year"
-                ]
-            })
-            result = item_response.get("result", {})
-            item = result.get("item", {})
-        except Exception as e:
-            print(f"[ERROR] Failed to get current item: {e}", flush=True)
-            raise e  # This is critical, so re-raise
+        # Current item is critical, so if it is missing, show error
+        item = player["item"]
+        if item is None:
+            print(f"[ERROR] Failed to get current item", flush=True)
+            raise RuntimeError("Player.GetItem returned no item")
         
         # Get item type to know which API call to make
         playback_type = item.get("type", "unknown")
         
+        # Artwork only needs the item, so prepare it while the details are looked up
+        art_future = kodi_client.submit(prepare_and_download_art, kodi, item, deadline)
+        
         # Initialize details with basic fallback structure
         details = {
             "album": {"title": item.get("album", ""), "year": item.get("year", "")},
@@ -1044,10 +1977,10 @@ def now_playing():
         if playback_type == "episode":
             try:
                 print(f"[DEBUG] Getting enhanced details for episode", flush=True)
-                episode_response = kodi_rpc("VideoLibrary.GetEpisodeDetails", {
+                episode_response = kodi_rpc(kodi, "VideoLibrary.GetEpisodeDetails", {
                     "episodeid": item.get("id"),
                 "properties": ["streamdetails", "genre", "director", "cast", "uniqueid", "rating"]
-            })
+            }, deadline=deadline)
                 if episode_response and episode_response.get("result"):
                     episode_details = episode_response["result"].get("episodedetails", {})
                     # Merge enhanced details with basic item data
@@ -1070,10 +2003,10 @@ def now_playing():
         elif playback_type == "movie":
             try:
                 print(f"[DEBUG] Getting enhanced details for movie", flush=True)
-                movie_response = kodi_rpc("VideoLibrary.GetMovieDetails", {
+                movie_response = kodi_rpc(kodi, "VideoLibrary.GetMovieDetails", {
                     "movieid": item.get("id"),
                 "properties": ["streamdetails", "genre", "director", "cast", "uniqueid", "rating"]
-            })
+            }, deadline=deadline)
                 if movie_response and movie_response.get("result"):
                     movie_details = movie_response["result"].get("moviedetails", {})
                     # Merge enhanced details with basic item data
@@ -1094,11 +2027,19 @@ def now_playing():
             try:
                 print(f"[DEBUG] Getting enhanced details for song", flush=True)
                 print(f"[DEBUG] Basic item ID: {item.get('id')}", flush=True)
-                # Get song details using the basic item ID
-                song_response = kodi_rpc("AudioLibrary.GetSongDetails", {
-                    "songid": item.get("id"),
-                    "properties": ["title", "album", "artist", "duration", "rating", "year", "genre", "fanart", "thumbnail", "albumid", "artistid", "bitrate", "channels", "samplerate", "bpm", "comment", "lyrics", "mood", "playcount", "track", "disc"]
-                })
+                # Get song, album and artist details in one round trip, using the ids Player.GetItem already returned
+                item_albumid = item.get("albumid")
+                item_artistid = item.get("artistid")
+                if isinstance(item_artistid, list):
+                    item_artistid = item_artistid[0] if item_artistid else None
+                calls = [("AudioLibrary.GetSongDetails", {"songid": item.get("id"), "properties": SONG_DETAILS_PROPERTIES})]
+                if item_albumid:
+                    calls.append(("AudioLibrary.GetAlbumDetails", {"albumid": item_albumid, "properties": ALBUM_DETAILS_PROPERTIES}))
+                if item_artistid:
+                    calls.append(("AudioLibrary.GetArtistDetails", {"artistid": item_artistid, "properties": ARTIST_DETAILS_PROPERTIES}))
+                batch_responses = dict(zip([method for method, _ in calls], kodi_rpc_batch(kodi, calls, deadline)))
+                
+                song_response = batch_responses.get("AudioLibrary.GetSongDetails")
                 if song_response and song_response.get("result"):
                     song_details = song_response["result"].get("songdetails", {})
                     details.update(song_details)
@@ -1108,10 +2049,14 @@ def now_playing():
                 albumid = song_details.get("albumid")
                 if albumid:
                     try:
-                        album_response = kodi_rpc("AudioLibrary.GetAlbumDetails", {
-                            "albumid": albumid,
-                            "properties": ["title", "artist", "year", "rating", "fanart", "thumbnail", "description", "genre", "mood", "style", "theme", "albumduration", "playcount", "albumlabel", "compilation", "totaldiscs"]
-                        })
+                        # Only go back to Kodi if the song disagrees with the item about its album
+                        if albumid == item_albumid:
+                            album_response = batch_responses.get("AudioLibrary.GetAlbumDetails")
+                        else:
+                            album_response = kodi_rpc(kodi, "AudioLibrary.GetAlbumDetails", {
+                                "albumid": albumid,
+                                "properties": ALBUM_DETAILS_PROPERTIES
+                            }, deadline=deadline)
                         if album_response and album_response.get("result"):
                             album_details = album_response["result"].get("albumdetails", {})
                             details["album"] = album_details
@@ -1128,10 +2073,13 @@ def now_playing():
                         artistid = artistid[0]
                         print(f"[DEBUG] Converted artistid to: {artistid}, type: {type(artistid)}", flush=True)
                     try:
-                        artist_response = kodi_rpc("AudioLibrary.GetArtistDetails", {
-                            "artistid": artistid,
-                            "properties": ["fanart", "thumbnail", "description", "born", "formed", "died", "disbanded", "genre", "mood", "style", "yearsactive"]
-                        })
+                        if artistid == item_artistid:
+                            artist_response = batch_responses.get("AudioLibrary.GetArtistDetails")
+                        else:
+                            artist_response = kodi_rpc(kodi, "AudioLibrary.GetArtistDetails", {
+                                "artistid": artistid,
+                                "properties": ARTIST_DETAILS_PROPERTIES
+                            }, deadline=deadline)
                         if artist_response and artist_response.get("result"):
                             artist_details = artist_response["result"].get("artistdetails", {})
                             details["artist"] = artist_details
@@ -1152,12 +2100,8 @@ def now_playing():
             print(f"[DEBUG] Using basic item data for {playback_type}", flush=True)
 
 
-        # Playback progress
-        progress_response = kodi_rpc("Player.GetProperties", {
-            "playerid": player_id,
-            "properties": ["time", "totaltime", "speed"]
-        })
-        progress = progress_response.get("result") if progress_response else {}
+        # Playback progress (fetched alongside the item)
+        progress = player["progress"]
         t = progress.get("time", {})
         d = progress.get("totaltime", {})
         speed = progress.get("speed", 0)
@@ -1167,11 +2111,9 @@ def now_playing():
         percent = int((elapsed / duration) * 100) if duration else 0
         paused = speed == 0
 
-        session_id = uuid.uuid4().hex
-        
         # Try to download artwork, but don't fail if this breaks
         try:
-            downloaded_art = prepare_and_download_art(item, session_id)
+            downloaded_art = art_future.result()
         except Exception as e:
             print(f"[WARNING] Artwork download failed, continuing without artwork: {e}", flush=True)
             downloaded_art = {}  # Empty artwork - page will still work
@@ -1184,7 +2126,7 @@ def now_playing():
         }
 
         # Use the modular system to generate HTML
-        html = route_media_display(item, session_id, downloaded_art, progress_data, details)
+        html = route_media_display(item, downloaded_art, progress_data, details, host)
         return render_template_string(html)
     except Exception as e:
         print(f"[ERROR] Critical failure in now_playing route: {e}", flush=True)
@@ -1300,5 +2242,47 @@ def generate_fallback_html(item, progress_data):
     </html>
     """
 
+def setup_kodi_host(kodi):
+    """Give a Kodi host its own circuit breaker, notification listener, client registry, idle backoff and playback poller"""
+    kodi.breaker = CircuitBreaker(
+        f"Kodi {kodi.name}",
+        failure_threshold=KODI_BREAKER_THRESHOLD,
+        reset_timeout=KODI_BREAKER_RESET
+    )
+    kodi.listener = NotificationListener(
+        kodi.hostname,
+        KODI_TCP_PORT,
+        functools.partial(on_kodi_notification, kodi),
+        methods=PLAYER_NOTIFICATIONS + LIBRARY_NOTIFICATIONS,
+        # Notifications may have been missed while disconnected, so resync with a poll
+        on_connect=lambda: kodi.poller.wake(),
+        on_disconnect=lambda: kodi.poller.wake()
+    )
+    # A display watching without notifications would only learn of new playback from
+    # these checks, so then the backoff stays at its first step
+    kodi.idle = IdleBackoff(
+        kodi.name,
+        minimum=IDLE_BACKOFF_MIN,
+        maximum=IDLE_BACKOFF_MAX,
+        limit=lambda: IDLE_BACKOFF_MIN if kodi.clients.watching and not kodi.listener.connected else None
+    )
+    # The first display to show up gets fresh state straight away
+    kodi.clients = ClientRegistry(kodi.name, poll_window=CLIENT_ACTIVE_WINDOW, on_watched=lambda: kodi.poller.wake())
+    kodi.poller = PlaybackPoller(
+        functools.partial(fetch_playback, kodi),
+        interval=STATE_POLL_INTERVAL,
+        pushed_interval=STATE_POLL_INTERVAL_PUSHED,
+        item_check_interval=EPISODE_CHECK_INTERVAL,
+        item_check_max_interval=ITEM_CHECK_MAX_INTERVAL,
+        is_pushed=lambda: kodi.listener.connected,
+        unwatched_interval=STATE_POLL_INTERVAL_UNWATCHED,
+        is_watched=lambda: kodi.clients.watching,
+        idle_backoff=kodi.idle
+    )
+
+for kodi_host in KODI_HOSTS:
+    setup_kodi_host(kodi_host)
+
 if __name__ == "__main__":
+    start_background_services()
     app.run(host="0.0.0.0", port=5001)
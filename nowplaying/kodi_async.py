@@ -0,0 +1,122 @@
+"""
+Asyncio Kodi client for Kodi Now Playing application.
+Independent lookups (artwork downloads to prepare, fanart files to probe, artwork
+preparation next to the detail lookups) are issued concurrently on a background
+event loop, so a render waits for the slowest call instead of the sum of them.
+Synchronous Flask routes reach the loop through run() and submit(). Calls made
+through fetch() are also capped per host, so one slow image host cannot take
+every slot.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncKodiClient:
+    """
+    Runs blocking Kodi calls concurrently, at most `concurrency` at a time.
+
+    The calls themselves still go through the synchronous kodi_rpc(), so the
+    connection pool, request coalescing, library cache and circuit breaker all
+    apply - the event loop only decides what runs in parallel.
+
+    Args:
+        rpc (callable): rpc(kodi, method, params, deadline) -> decoded JSON-RPC response
+        concurrency (int): Calls allowed in flight at once
+        per_host (int): Calls allowed in flight at once per host through fetch()
+        name (str): Prefix for the pool's thread names
+    """
+
+    def __init__(self, rpc, concurrency=4, per_host=None, name="kodi-async"):
+        self._rpc = rpc
+        self.concurrency = concurrency
+        self.per_host = per_host or concurrency
+        self.name = name
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_per_host = {}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._host_semaphores = {}  # host -> asyncio.Semaphore, only touched on the loop
+        self._host_in_flight = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+                self._thread = threading.Thread(target=self._loop.run_forever, name=f"{self.name}-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro):
+        """
+        Run a coroutine on the client's loop and block until it finishes.
+
+        Must not be called from a coroutine running on that loop - await instead.
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncKodiClient.run() called from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def submit(self, fn, *args):
+        """
+        Start a blocking function in the background without holding a call slot
+        (it is expected to make its own calls through this client).
+
+        Returns:
+            concurrent.futures.Future: Resolves to fn's result
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(asyncio.to_thread(fn, *args), loop)
+
+    async def call(self, fn, *args):
+        """Run one blocking call in the worker pool once a slot is free"""
+        async with self._semaphore:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            finally:
+                self.in_flight -= 1
+
+    async def fetch(self, host, fn, *args):
+        """Like call(), but also waits for one of the host's per_host slots"""
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        async with semaphore:
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+            self.peak_per_host[host] = max(self.peak_per_host.get(host, 0), self._host_in_flight[host])
+            try:
+                return await self.call(fn, *args)
+            finally:
+                self._host_in_flight[host] -= 1
+
+    async def rpc(self, kodi, method, params=None, deadline=None):
+        return await self.call(self._rpc, kodi, method, params, deadline)
+
+    @staticmethod
+    async def gather(*aws):
+        """
+        Await everything concurrently. Results keep the order of aws; a failed
+        call shows up as its exception instead of cancelling the others.
+        """
+        return await asyncio.gather(*aws, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "per_host": self.per_host,
+            "peak_per_host": dict(self.peak_per_host),
+        }
@@ -0,0 +1,148 @@
+"""
+Kodi notification listener for Kodi Now Playing application.
+Keeps a connection open to Kodi's JSON-RPC TCP port (9090 by default) and hands
+player notifications to a callback the moment Kodi sends them, reconnecting
+with backoff whenever the connection drops.
+"""
+import codecs
+import json
+import socket
+import threading
+
+PLAYER_NOTIFICATIONS = (
+    "Player.OnPlay",
+    "Player.OnAVStart",
+    "Player.OnPause",
+    "Player.OnResume",
+    "Player.OnStop",
+    "Player.OnSeek",
+)
+
+LIBRARY_NOTIFICATIONS = (
+    "VideoLibrary.OnUpdate",
+    "VideoLibrary.OnRemove",
+    "VideoLibrary.OnScanFinished",
+    "VideoLibrary.OnCleanFinished",
+    "AudioLibrary.OnUpdate",
+    "AudioLibrary.OnRemove",
+    "AudioLibrary.OnScanFinished",
+    "AudioLibrary.OnCleanFinished",
+)
+
+
+class NotificationListener:
+    """
+    Background thread consuming Kodi's JSON-RPC notification stream.
+
+    Args:
+        host (str): Kodi hostname or IP
+        port (int): Kodi JSON-RPC TCP port
+        on_notification (callable): Called as on_notification(method, data) for each wanted notification
+        on_connect (callable): Called after every (re)connect - notifications sent while
+            disconnected are lost, so this is the place to resync state
+        on_disconnect (callable): Called when an established connection drops
+        methods (tuple): Notification methods to pass on
+        reconnect_min (float): First reconnect delay in seconds, doubled on each failure
+        reconnect_max (float): Upper bound for the reconnect delay
+    """
+
+    def __init__(self, host, port, on_notification, on_connect=None, on_disconnect=None,
+                 methods=PLAYER_NOTIFICATIONS, reconnect_min=1, reconnect_max=60):
+        self.host = host
+        self.port = port
+        self.on_notification = on_notification
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.methods = set(methods)
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="kodi-notifications", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def wait_connected(self, timeout=None):
+        return self._connected.wait(timeout)
+
+    def _run(self):
+        delay = self.reconnect_min
+        while not self._stopped.is_set():
+            try:
+                with socket.create_connection((self.host, self.port), timeout=5) as sock:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                    # Short read timeout so stop() is noticed without waiting for Kodi to talk
+                    sock.settimeout(1)
+                    print(f"[INFO] Connected to Kodi notifications at {self.host}:{self.port}", flush=True)
+                    self._connected.set()
+                    delay = self.reconnect_min
+                    if self.on_connect:
+                        self.on_connect()
+                    self._read_loop(sock)
+            except OSError as e:
+                print(f"[DEBUG] Kodi notification connection to {self.host}:{self.port} failed: {e}", flush=True)
+            finally:
+                if self._connected.is_set():
+                    self._connected.clear()
+                    print(f"[WARNING] Lost Kodi notification connection, falling back to polling", flush=True)
+                    if self.on_disconnect:
+                        self.on_disconnect()
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _read_loop(self, sock):
+        # Kodi writes bare JSON objects back to back with no framing, so decode
+        # as many complete objects as the buffer holds and keep the remainder
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        buffer = ""
+        while not self._stopped.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                return
+            buffer += text_decoder.decode(chunk)
+            while buffer:
+                buffer = buffer.lstrip()
+                if buffer and not buffer.startswith("{"):
+                    # Skip anything that cannot start a notification object
+                    next_object = buffer.find("{")
+                    buffer = buffer[next_object:] if next_object >= 0 else ""
+                    continue
+                try:
+                    message, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    break  # Incomplete object, wait for more data
+                buffer = buffer[end:]
+                self._dispatch(message)
+
+    def _dispatch(self, message):
+        if not isinstance(message, dict):
+            return
+        method = message.get("method")
+        if method not in self.methods:
+            return
+        data = message.get("params", {}).get("data") or {}
+        print(f"[DEBUG] Kodi notification {method}: {data}", flush=True)
+        try:
+            self.on_notification(method, data)
+        except Exception as e:
+            print(f"[ERROR] Failed to handle notification {method}: {e}", flush=True)
+
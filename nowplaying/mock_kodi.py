@@ -0,0 +1,665 @@
+"""
+Mock Kodi server for Kodi Now Playing application.
+A stand-in for a real Kodi box, for development, benchmarks and load tests:
+serves the JSON-RPC methods and /vfs/ images this app uses from a synthetic
+library, pushes notifications over TCP, and can add latency, errors and 401s.
+
+    python mock_kodi.py --port 8080 --tcp-port 9090 --latency 0.05
+    KODI_HOST=http://localhost:8080 KODI_USER= python kodi-nowplaying.py
+
+Playback is driven from the command line (--play, --cycle) or over HTTP:
+POST /mock/play?type=movie&id=2, /mock/pause, /mock/resume, /mock/stop,
+/mock/seek?time=120 and /mock/update?type=movie&id=2. GET /mock/stats returns
+call counts per method.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_HOST = "nfs://mock/Media"
+
+# Kodi's fixed player ids
+AUDIO_PLAYER = 0
+VIDEO_PLAYER = 1
+
+# Library details method -> (item type, id field, result key)
+DETAIL_METHODS = {
+    "VideoLibrary.GetMovieDetails": ("movie", "movieid", "moviedetails"),
+    "VideoLibrary.GetEpisodeDetails": ("episode", "episodeid", "episodedetails"),
+    "AudioLibrary.GetSongDetails": ("song", "songid", "songdetails"),
+    "AudioLibrary.GetAlbumDetails": ("album", "albumid", "albumdetails"),
+    "AudioLibrary.GetArtistDetails": ("artist", "artistid", "artistdetails"),
+}
+
+FAILED = {"code": -32100, "message": "Failed to execute method."}
+INVALID_PARAMS = {"code": -32602, "message": "Invalid params."}
+METHOD_NOT_FOUND = {"code": -32601, "message": "Method not found."}
+
+
+def image_url(path):
+    """Kodi's image:// wrapping of a file path, as found in art maps"""
+    return f"image://{urllib.parse.quote(path, safe='')}/"
+
+
+def unwrap_image_url(path):
+    if path.startswith("image://"):
+        path = urllib.parse.unquote(path[len("image://"):])
+        if path.endswith("/"):
+            path = path[:-1]
+    return path
+
+
+def kodi_time(seconds):
+    seconds = max(int(seconds), 0)
+    return {"hours": seconds // 3600, "minutes": seconds // 60 % 60, "seconds": seconds % 60, "milliseconds": 0}
+
+
+def build_library(movies=6, shows=2, episodes=6, artists=3, albums=2, songs=5, extrafanart=3):
+    """
+    Synthetic library with artwork files laid out the way this app looks for them.
+
+    Returns:
+        dict: {"movie", "episode", "song", "album", "artist"} id -> details,
+              plus "files", the set of every file path that exists
+    """
+    rng = random.Random(42)
+    library = {"movie": {}, "episode": {}, "song": {}, "album": {}, "artist": {}, "files": set()}
+    files = library["files"]
+    genres = ["Drama", "Comedy", "Sci-Fi", "Thriller", "Documentary", "Rock", "Jazz", "Electronic"]
+
+    def add_art(folder, names):
+        art = {}
+        for name in names:
+            path = f"{folder}/{name}"
+            files.add(path)
+            art[name.rsplit(".", 1)[0]] = image_url(path)
+        return art
+
+    def add_extrafanart(folder, art):
+        for i in range(1, extrafanart + 1):
+            path = f"{folder}/extrafanart/fanart{i}.jpg"
+            files.add(path)
+            art[f"fanart{i}"] = image_url(path)
+
+    for movieid in range(1, movies + 1):
+        year = 1990 + movieid
+        title = f"Mock Movie {movieid}"
+        folder = f"{MOCK_HOST}/Movies/{title} ({year})"
+        media = f"{folder}/{title} ({year}).mkv"
+        files.add(media)
+        art = add_art(folder, ["poster.jpg", "fanart.jpg", "clearlogo.png", "clearart.png", "banner.jpg", "discart.png"])
+        add_extrafanart(folder, art)
+        library["movie"][movieid] = {
+            "movieid": movieid, "label": title, "title": title, "year": year,
+            "plot": f"The plot of {title}.", "genre": [rng.choice(genres[:5])],
+            "director": [f"Director {movieid}"],
+            "cast": [{"name": f"Actor {movieid}{n}", "role": f"Role {n}", "order": n} for n in range(3)],
+            "rating": round(rng.uniform(5, 9), 1), "duration": rng.randint(80, 150) * 60,
+            "file": media, "art": art, "uniqueid": {"imdb": f"tt{movieid:07d}"},
+            "streamdetails": {
+                "video": [{"codec": "hevc", "width": 3840, "height": 2160, "aspect": 1.78, "hdrtype": "hdr10"}],
+                "audio": [{"codec": "truehd", "channels": 8, "language": "eng"}],
+                "subtitle": [{"language": "eng"}],
+            },
+        }
+
+    episodeid = 0
+    for tvshowid in range(1, shows + 1):
+        showtitle = f"Mock Show {tvshowid}"
+        show_folder = f"{MOCK_HOST}/TV/{showtitle}"
+        show_art = add_art(show_folder, ["poster.jpg", "fanart.jpg", "clearlogo.png", "banner.jpg"])
+        season_poster = f"{show_folder}/season01-poster.jpg"
+        files.add(season_poster)
+        for number in range(1, episodes + 1):
+            episodeid += 1
+            folder = f"{show_folder}/Season 01"
+            media = f"{folder}/{showtitle} S01E{number:02d}.mkv"
+            thumb = f"{folder}/{showtitle} S01E{number:02d}-thumb.jpg"
+            files.update([media, thumb])
+            art = {f"tvshow.{key}": value for key, value in show_art.items()}
+            art.update({"thumb": image_url(thumb), "season.poster": image_url(season_poster)})
+            library["episode"][episodeid] = {
+                "episodeid": episodeid, "label": f"Episode {number}", "title": f"Episode {number}",
+                "showtitle": showtitle, "tvshowid": tvshowid, "season": 1, "episode": number,
+                "plot": f"Episode {number} of {showtitle}.", "genre": [rng.choice(genres[:5])],
+                "director": [f"Director {tvshowid}"], "cast": [{"name": f"Actor {tvshowid}", "role": "Lead", "order": 0}],
+                "rating": round(rng.uniform(6, 9), 1), "duration": rng.randint(22, 60) * 60, "year": 2010 + tvshowid,
+                "file": media, "art": art, "uniqueid": {"tvdb": str(1000 + episodeid)},
+                "streamdetails": {
+                    "video": [{"codec": "h264", "width": 1920, "height": 1080, "aspect": 1.78}],
+                    "audio": [{"codec": "eac3", "channels": 6, "language": "eng"}],
+                    "subtitle": [],
+                },
+            }
+
+    albumid = 0
+    songid = 0
+    for artistid in range(1, artists + 1):
+        name = f"Mock Artist {artistid}"
+        artist_folder = f"{MOCK_HOST}/Music/{name}"
+        artist_art = add_art(artist_folder, ["fanart.jpg", "clearlogo.png", "thumb.jpg"])
+        add_extrafanart(artist_folder, artist_art)
+        genre = [rng.choice(genres[5:])]
+        library["artist"][artistid] = {
+            "artistid": artistid, "label": name, "artist": name, "description": f"Biography of {name}.",
+            "genre": genre, "mood": [], "style": [], "yearsactive": [], "born": "", "formed": "1990",
+            "died": "", "disbanded": "", "thumbnail": artist_art["thumb"], "fanart": artist_art["fanart"],
+        }
+        for _ in range(albums):
+            albumid += 1
+            album_title = f"Mock Album {albumid}"
+            year = 2000 + albumid
+            folder = f"{artist_folder}/{album_title}"
+            cover = f"{folder}/folder.jpg"
+            files.add(cover)
+            library["album"][albumid] = {
+                "albumid": albumid, "label": album_title, "title": album_title, "artist": [name],
+                "year": year, "rating": round(rng.uniform(5, 9), 1), "genre": genre,
+                "description": f"Review of {album_title}.", "albumlabel": "Mock Records",
+                "thumbnail": image_url(cover), "fanart": artist_art["fanart"],
+                "mood": [], "style": [], "theme": [], "playcount": 0, "compilation": False, "totaldiscs": 1,
+                "albumduration": 0,
+            }
+            for track in range(1, songs + 1):
+                songid += 1
+                title = f"Mock Song {songid}"
+                media = f"{folder}/{track:02d} - {title}.flac"
+                files.add(media)
+                duration = rng.randint(150, 320)
+                library["album"][albumid]["albumduration"] += duration
+                library["song"][songid] = {
+                    "songid": songid, "label": title, "title": title, "artist": [name], "artistid": [artistid],
+                    "album": album_title, "albumid": albumid, "track": track, "disc": 1, "year": year,
+                    "genre": genre, "duration": duration, "rating": 0, "file": media,
+                    "bitrate": 1411, "channels": 2, "samplerate": 44100, "bpm": 0, "comment": "", "lyrics": "",
+                    "mood": [], "playcount": 0, "thumbnail": image_url(cover), "fanart": artist_art["fanart"],
+                    "art": {
+                        "album.thumb": image_url(cover), "thumb": image_url(cover),
+                        "artist.fanart": artist_art["fanart"], "artist.clearlogo": artist_art["clearlogo"],
+                        "artist.thumb": artist_art["thumb"],
+                    },
+                }
+    return library
+
+
+def make_png(seed, size):
+    """A valid 16x9 single-colour PNG, padded to roughly size bytes with an ancillary chunk"""
+    digest = hashlib.sha1(seed.encode()).digest()
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    width, height = 16, 9
+    rows = b"".join(b"\x00" + digest[:3] * width for _ in range(height))
+    png = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(rows))
+    padding = size - len(png) - 24
+    if padding > 0:
+        png += chunk(b"mkPd", bytes(padding))
+    return png + chunk(b"IEND", b"")
+
+
+class MockKodi:
+    """
+    Mock Kodi state plus its HTTP (JSON-RPC and /vfs/) and TCP notification servers.
+
+    Args:
+        port (int): HTTP port, 0 for any free port
+        tcp_port (int): Notification port, 0 for any free port, None to disable
+        latency (float): Seconds added to every JSON-RPC call
+        method_latency (dict): Per-method latency overriding `latency`
+        error_rate (float): Share of JSON-RPC calls answered with an error
+        method_error_rate (dict): Per-method error rate overriding `error_rate`
+        image_latency (float): Seconds added to every /vfs/ request
+        image_size (int): Approximate size of served images in bytes
+        image_401_rate (float): Share of /vfs/ requests answered with 401
+        auth (tuple): (user, password) required on every request, or None
+        cycle (float): Move on to the next item after this many seconds of playback
+        seed (int): Seed for the error and 401 dice, for repeatable runs
+        library (dict): Library from build_library(), a default one when omitted
+    """
+
+    def __init__(self, port=8080, tcp_port=9090, latency=0.0, method_latency=None, error_rate=0.0,
+                 method_error_rate=None, image_latency=0.0, image_size=50000, image_401_rate=0.0,
+                 auth=None, cycle=None, seed=None, library=None):
+        self.port = port
+        self.tcp_port = tcp_port
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.error_rate = error_rate
+        self.method_error_rate = method_error_rate or {}
+        self.image_latency = image_latency
+        self.image_size = image_size
+        self.image_401_rate = image_401_rate
+        self.auth = auth
+        self.cycle = cycle
+        self.library = library or build_library()
+        self.calls = {}
+        self.batches = 0
+        self.images = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._clients = []
+        self._http = None
+        self._tcp = None
+        self._stopped = threading.Event()
+        # Playback: item type/id, speed and the position anchored at a monotonic time
+        self._playing = None
+        self._speed = 0
+        self._position = 0.0
+        self._anchored_at = 0.0
+
+    # -- playback --------------------------------------------------------------
+
+    def _elapsed(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self._position + (now - self._anchored_at) * self._speed
+
+    def _anchor(self, position=None):
+        self._position = self._elapsed() if position is None else position
+        self._anchored_at = time.monotonic()
+
+    def _player(self):
+        return {"playerid": VIDEO_PLAYER if self._playing[0] in ("movie", "episode") else AUDIO_PLAYER, "speed": self._speed}
+
+    def _item_ref(self):
+        kind, item_id = self._playing
+        return {"id": item_id, "type": kind, "title": self.library[kind][item_id]["title"]}
+
+    def play(self, kind, item_id=None):
+        with self._lock:
+            items = self.library[kind]
+            item_id = item_id if item_id is not None else min(items)
+            if item_id not in items:
+                raise KeyError(f"No {kind} with id {item_id}")
+            # Like a playlist moving on, switching items sends no OnStop in between
+            self._playing = (kind, item_id)
+            self._speed = 1
+            self._anchor(0)
+            print(f"[INFO] Playing {kind} {item_id}: {items[item_id]['title']}", flush=True)
+            self.notify("Player.OnPlay", {"item": self._item_ref(), "player": self._player()})
+            self.notify("Player.OnAVStart", {"item": self._item_ref(), "player": self._player()})
+
+    def play_next(self):
+        """Move on to the next item of the same type, wrapping around"""
+        with self._lock:
+            if not self._playing:
+                return
+            kind, item_id = self._playing
+            ids = sorted(self.library[kind])
+            self.play(kind, ids[(ids.index(item_id) + 1) % len(ids)])
+
+    def pause(self):
+        with self._lock:
+            if self._playing and self._speed:
+                self._anchor()
+                self._speed = 0
+                self.notify("Player.OnPause", {"item": self._item_ref(), "player": self._player()})
+
+    def resume(self):
+        with self._lock:
+            if self._playing and not self._speed:
+                self._anchor()
+                self._speed = 1
+                self.notify("Player.OnResume", {"item": self._item_ref(), "player": self._player()})
+
+    def stop(self):
+        with self._lock:
+            if self._playing:
+                item = self._item_ref()
+                self._playing = None
+                self._speed = 0
+                self.notify("Player.OnStop", {"item": item, "end": False})
+
+    def seek(self, seconds):
+        with self._lock:
+            if self._playing:
+                self._anchor(seconds)
+                player = dict(self._player(), time=kodi_time(seconds))
+                self.notify("Player.OnSeek", {"item": self._item_ref(), "player": player})
+
+    def update(self, kind, item_id):
+        """Pretend a library item was edited"""
+        library = "AudioLibrary" if kind in ("song", "album", "artist") else "VideoLibrary"
+        self.notify(f"{library}.OnUpdate", {"item": {"id": item_id, "type": kind}})
+
+    def _tick(self):
+        """Advance to the next item when the current one ends or the cycle time is up"""
+        while not self._stopped.wait(0.5):
+            with self._lock:
+                if not self._playing:
+                    continue
+                kind, item_id = self._playing
+                duration = self.library[kind][item_id]["duration"]
+                elapsed = self._elapsed()
+                if elapsed >= duration or (self.cycle and self._speed and elapsed >= self.cycle):
+                    self.play_next()
+
+    # -- notifications ---------------------------------------------------------
+
+    def notify(self, method, data):
+        message = json.dumps({"jsonrpc": "2.0", "method": method, "params": {"data": data, "sender": "xbmc"}}).encode()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.sendall(message)
+            except OSError:
+                with self._lock:
+                    if client in self._clients:
+                        self._clients.remove(client)
+        print(f"[DEBUG] Pushed {method} to {len(clients)} client(s)", flush=True)
+
+    def _serve_notifications(self):
+        mock = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with mock._lock:
+                    mock._clients.append(self.request)
+                print(f"[INFO] Notification client connected from {self.client_address[0]}", flush=True)
+                try:
+                    # Nothing to answer - just notice when the client goes away
+                    while not mock._stopped.is_set() and self.request.recv(4096):
+                        pass
+                except OSError:
+                    pass
+                finally:
+                    with mock._lock:
+                        if self.request in mock._clients:
+                            mock._clients.remove(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._tcp = socketserver.ThreadingTCPServer(("", self.tcp_port), Handler)
+        self._tcp.daemon_threads = True
+        self.tcp_port = self._tcp.server_address[1]
+        threading.Thread(target=self._tcp.serve_forever, name="mock-kodi-tcp", daemon=True).start()
+
+    # -- JSON-RPC --------------------------------------------------------------
+
+    def handle_rpc(self, request):
+        method = request.get("method", "")
+        params = request.get("params") or {}
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        time.sleep(self.method_latency.get(method, self.latency))
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if self._random.random() < self.method_error_rate.get(method, self.error_rate):
+            response["error"] = FAILED
+            return response
+        try:
+            result = self._dispatch(method, params)
+        except LookupError:
+            response["error"] = INVALID_PARAMS
+            return response
+        if result is None:
+            response["error"] = METHOD_NOT_FOUND
+        else:
+            response["result"] = result
+        return response
+
+    def _dispatch(self, method, params):
+        with self._lock:
+            if method == "JSONRPC.Ping":
+                return "pong"
+            if method == "Player.GetActivePlayers":
+                if not self._playing:
+                    return []
+                player = self._player()
+                return [{"playerid": player["playerid"], "playertype": "internal",
+                         "type": "video" if player["playerid"] == VIDEO_PLAYER else "audio"}]
+            if method in ("Player.GetItem", "Player.GetProperties"):
+                if not self._playing or params.get("playerid") != self._player()["playerid"]:
+                    raise LookupError("player not active")
+                kind, item_id = self._playing
+                details = self.library[kind][item_id]
+                if method == "Player.GetItem":
+                    item = self._select(details, params.get("properties"))
+                    item.update(id=item_id, type=kind, label=details["label"])
+                    return {"item": item}
+                properties = {
+                    "time": kodi_time(self._elapsed()),
+                    "totaltime": kodi_time(details["duration"]),
+                    "speed": self._speed,
+                    "percentage": 100 * self._elapsed() / details["duration"],
+                }
+                return {name: properties[name] for name in params.get("properties", []) if name in properties}
+        if method in DETAIL_METHODS:
+            kind, id_field, key = DETAIL_METHODS[method]
+            details = self.library[kind][params[id_field]]
+            result = self._select(details, params.get("properties"))
+            result.update({id_field: details[id_field], "label": details["label"]})
+            return {key: result}
+        if method == "Files.GetDirectory":
+            return self._list_directory(unwrap_image_url(params["directory"]).rstrip("/"))
+        if method == "Files.PrepareDownload":
+            # Like Kodi, hand out a download path without checking the file exists -
+            # a missing file only shows up as a 404 on the /vfs/ download
+            path = unwrap_image_url(params["path"])
+            return {"details": {"path": "vfs/" + urllib.parse.quote(path, safe="")}, "mode": "redirect", "protocol": "http"}
+        return None
+
+    @staticmethod
+    def _select(details, properties):
+        if properties is None:
+            return dict(details)
+        return {name: details[name] for name in properties if name in details}
+
+    def _list_directory(self, directory):
+        prefix = directory + "/"
+        entries = {}
+        for path in self.library["files"]:
+            if path.startswith(prefix):
+                name, _, rest = path[len(prefix):].partition("/")
+                entries[prefix + name] = "directory" if rest else "file"
+        if not entries:
+            raise LookupError(directory)
+        files = [{"file": path, "filetype": kind, "label": os.path.basename(path), "type": "unknown"}
+                 for path, kind in sorted(entries.items())]
+        return {"files": files, "limits": {"start": 0, "end": len(files), "total": len(files)}}
+
+    # -- HTTP ------------------------------------------------------------------
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="application/json", head=False):
+                self.send_response(status)
+                if status == 401:
+                    self.send_header("WWW-Authenticate", 'Basic realm="XBMC"')
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _authorized(self):
+                if not mock.auth:
+                    return True
+                expected = "Basic " + base64.b64encode(":".join(mock.auth).encode()).decode()
+                return self.headers.get("Authorization") == expected
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def do_POST(self):
+                url = urllib.parse.urlsplit(self.path)
+                body = self._body()
+                if url.path.startswith("/mock/"):
+                    return self._control(url)
+                if not self._authorized():
+                    return self._send(401, b"Unauthorized", "text/plain")
+                if url.path != "/jsonrpc":
+                    return self._send(404, b"Not found", "text/plain")
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    return self._send(200, json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error."}}).encode())
+                if isinstance(payload, list):
+                    with mock._lock:
+                        mock.batches += 1
+                    # Kodi works through a batch one call after the other
+                    result = [mock.handle_rpc(request) for request in payload]
+                else:
+                    result = mock.handle_rpc(payload)
+                self._send(200, json.dumps(result).encode())
+
+            def do_GET(self, head=False):
+                url = urllib.parse.urlsplit(self.path)
+                if url.path == "/mock/stats":
+                    return self._send(200, json.dumps(mock.stats()).encode(), head=head)
+                if not self._authorized():
+                    return self._send(401, b"Unauthorized", "text/plain", head)
+                if not url.path.startswith("/vfs/"):
+                    return self._send(404, b"Not found", "text/plain", head)
+                with mock._lock:
+                    mock.images += 1
+                time.sleep(mock.image_latency)
+                if mock._random.random() < mock.image_401_rate:
+                    return self._send(401, b"Unauthorized", "text/plain", head)
+                path = unwrap_image_url(urllib.parse.unquote(url.path[len("/vfs/"):]))
+                if path not in mock.library["files"]:
+                    return self._send(404, b"Not found", "text/plain", head)
+                self._send(200, make_png(path, mock.image_size), "image/png", head)
+
+            def do_HEAD(self):
+                self.do_GET(head=True)
+
+            def _control(self, url):
+                query = dict(urllib.parse.parse_qsl(url.query))
+                action = url.path[len("/mock/"):]
+                try:
+                    if action == "play":
+                        item_id = query.get("id")
+                        mock.play(query.get("type", "movie"), int(item_id) if item_id else None)
+                    elif action == "next":
+                        mock.play_next()
+                    elif action == "pause":
+                        mock.pause()
+                    elif action == "resume":
+                        mock.resume()
+                    elif action == "stop":
+                        mock.stop()
+                    elif action == "seek":
+                        mock.seek(float(query["time"]))
+                    elif action == "update":
+                        mock.update(query["type"], int(query["id"]))
+                    else:
+                        return self._send(404, b"Unknown action", "text/plain")
+                except (KeyError, ValueError) as e:
+                    return self._send(400, json.dumps({"error": str(e)}).encode())
+                self._send(200, json.dumps(mock.stats()).encode())
+
+        return Handler
+
+    def start(self):
+        self._http = ThreadingHTTPServer(("", self.port), self._make_handler())
+        self._http.daemon_threads = True
+        self.port = self._http.server_address[1]
+        threading.Thread(target=self._http.serve_forever, name="mock-kodi-http", daemon=True).start()
+        if self.tcp_port is not None:
+            self._serve_notifications()
+        threading.Thread(target=self._tick, name="mock-kodi-tick", daemon=True).start()
+        print(f"[INFO] Mock Kodi on http://localhost:{self.port} (notifications on port {self.tcp_port})", flush=True)
+
+    def shutdown(self):
+        self._stopped.set()
+        for server in (self._http, self._tcp):
+            if server:
+                server.shutdown()
+                server.server_close()
+        with self._lock:
+            for client in self._clients:
+                try:
+                    client.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            playing = None
+            if self._playing:
+                kind, item_id = self._playing
+                playing = {"type": kind, "id": item_id, "speed": self._speed, "time": round(self._elapsed(), 1)}
+            return {
+                "playing": playing,
+                "calls": dict(sorted(self.calls.items())),
+                "total_calls": sum(self.calls.values()),
+                "batches": self.batches,
+                "images": self.images,
+                "notification_clients": len(self._clients),
+            }
+
+
+def parse_rates(values, kind=float):
+    """Parse repeated METHOD=VALUE options into a dict"""
+    rates = {}
+    for value in values or []:
+        method, _, number = value.partition("=")
+        rates[method] = kind(number)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Kodi JSON-RPC server for Kodi Now Playing")
+    parser.add_argument("--port", type=int, default=8080, help="HTTP port (default 8080)")
+    parser.add_argument("--tcp-port", type=int, default=9090, help="notification port (default 9090)")
+    parser.add_argument("--no-notifications", action="store_true", help="do not listen for notification clients")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every JSON-RPC call")
+    parser.add_argument("--method-latency", action="append", metavar="METHOD=SECONDS", help="per-method latency, repeatable")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of JSON-RPC calls that fail (0-1)")
+    parser.add_argument("--method-error-rate", action="append", metavar="METHOD=RATE", help="per-method error rate, repeatable")
+    parser.add_argument("--image-latency", type=float, default=0.0, help="seconds added to every image request")
+    parser.add_argument("--image-size", type=int, default=50000, help="approximate image size in bytes")
+    parser.add_argument("--image-401-rate", type=float, default=0.0, help="share of image requests answered with 401")
+    parser.add_argument("--auth", metavar="USER:PASS", help="require HTTP basic auth")
+    parser.add_argument("--play", metavar="TYPE[:ID]", default="movie", help="start playing (movie, episode, song or none)")
+    parser.add_argument("--cycle", type=float, default=0, help="move to the next item every N seconds")
+    parser.add_argument("--seed", type=int, help="seed for error and 401 dice")
+    args = parser.parse_args()
+
+    mock = MockKodi(
+        port=args.port,
+        tcp_port=None if args.no_notifications else args.tcp_port,
+        latency=args.latency,
+        method_latency=parse_rates(args.method_latency),
+        error_rate=args.error_rate,
+        method_error_rate=parse_rates(args.method_error_rate),
+        image_latency=args.image_latency,
+        image_size=args.image_size,
+        image_401_rate=args.image_401_rate,
+        auth=tuple(args.auth.split(":", 1)) if args.auth else None,
+        cycle=args.cycle or None,
+        seed=args.seed,
+    )
+    mock.start()
+    if args.play != "none":
+        kind, _, item_id = args.play.partition(":")
+        mock.play(kind, int(item_id) if item_id else None)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.shutdown()
+
+
+if __name__ == "__main__":
+    main()
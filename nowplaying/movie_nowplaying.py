@@ -3,22 +3,25 @@ Movie-specific HTML generation for Kodi Now Playing application.
 Handles movie display with discart spinning animation and movie-specific layout.
 """
 
-def generate_html(item, session_id, downloaded_art, progress_data, details):
+def generate_html(item, downloaded_art, progress_data, details, host=None):
     """
     Generate HTML for movie display.
     
     Args:
         item (dict): Media item from Kodi API
-        session_id (str): Session ID for file naming
         downloaded_art (dict): Downloaded artwork files
         progress_data (dict): Playback progress information
         details (dict): Detailed media information
+        host (str): Kodi host name for pages served under /nowplaying/<host>
         
     Returns:
         str: HTML content for movie display
     """
+    # A page for a named host follows that host, and waits on its own page once playback stops
+    host_path = f"/{host}" if host else ""
+    idle_url = f"/nowplaying{host_path}" if host else "/"
     # Extract URLs for artwork
-    poster_url = f"/media/{downloaded_art.get('poster')}" if downloaded_art.get("poster") else ""
+    poster_url = f"/art/{downloaded_art.get('poster')}" if downloaded_art.get("poster") else ""
     
     # Collect all fanart variants for slideshow
     fanart_variants = []
@@ -27,12 +30,12 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
     fanart_keys = ["fanart", "fanart1", "fanart2", "fanart3", "fanart4", "fanart5", "fanart6", "fanart7", "fanart8", "fanart9"]
     for fanart_key in fanart_keys:
         if downloaded_art.get(fanart_key):
-            fanart_variants.append(f"/media/{downloaded_art.get(fanart_key)}")
+            fanart_variants.append(f"/art/{downloaded_art.get(fanart_key)}")
     
     # Also check for extrafanart folder images (dynamic keys like extrafanart_main, extrafanart_fanart2, etc.)
     for key, value in downloaded_art.items():
         if key.startswith("extrafanart"):
-            fanart_variants.append(f"/media/{value}")
+            fanart_variants.append(f"/art/{value}")
     
     # Use first fanart as primary, or empty string if none
     fanart_url = fanart_variants[0] if fanart_variants else ""
@@ -41,10 +44,10 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
     print(f"[DEBUG] Movie fanart variants found: {len(fanart_variants)}", flush=True)
     print(f"[DEBUG] Movie fanart variants: {fanart_variants}", flush=True)
     
-    discart_url = f"/media/{downloaded_art.get('discart')}" if downloaded_art.get("discart") else ""
-    banner_url = f"/media/{downloaded_art.get('banner')}" if downloaded_art.get("banner") else ""
-    clearlogo_url = f"/media/{downloaded_art.get('clearlogo')}" if downloaded_art.get("clearlogo") else ""
-    clearart_url = f"/media/{downloaded_art.get('clearart')}" if downloaded_art.get("clearart") else ""
+    discart_url = f"/art/{downloaded_art.get('discart')}" if downloaded_art.get("discart") else ""
+    banner_url = f"/art/{downloaded_art.get('banner')}" if downloaded_art.get("banner") else ""
+    clearlogo_url = f"/art/{downloaded_art.get('clearlogo')}" if downloaded_art.get("clearlogo") else ""
+    clearart_url = f"/art/{downloaded_art.get('clearart')}" if downloaded_art.get("clearart") else ""
     
     # Extract movie information
     title = item.get("title", "Untitled")
@@ -561,14 +564,17 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
           }}
         }}
 
-        function resyncTime() {{
-          fetch('/nowplaying?json=1')
-            .then(res => res.json())
-            .then(data => {{
-              elapsed = data.elapsed;
-              duration = data.duration;
-              paused = data.paused;
-            }});
+        // ETag of the last /state answer - a state that has not changed comes back as an empty 304
+        let stateEtag = null;
+        // How long to wait before the next poll - the server adjusts it to what is playing
+        let nextPollMs = 2000;
+        
+        function applyState(data) {{
+          if (data.next_poll_ms) nextPollMs = data.next_poll_ms;
+          elapsed = data.elapsed;
+          duration = data.duration;
+          paused = data.paused;
+          handlePlaybackState(data);
         }}
 
         let lastItemId = null;
@@ -686,56 +692,114 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
           }}
         }}
         
-        function checkPlaybackChange() {{
-          fetch('/poll_playback')
+        function handlePlaybackState(data) {{
+          const currentState = data.playing;
+          const currentItemId = data.item_id;
+          const currentPaused = data.paused;
+          
+          // Update playback button based on pause state
+          if (currentPaused !== lastPausedState) {{
+            updatePlaybackButton(currentPaused);
+            lastPausedState = currentPaused;
+          }}
+          
+          // Check for playback state change (start/stop)
+          if (lastPlaybackState === null) {{
+            lastPlaybackState = currentState;
+            lastItemId = currentItemId;
+            lastPausedState = currentPaused;
+            updatePlaybackButton(currentPaused);
+          }} else if (currentState !== lastPlaybackState) {{
+            document.body.classList.add('fade-out');
+            setTimeout(() => {{
+              window.location.href = '{idle_url}'; // Redirect to the idle page when playback stops
+            }}, 1500);
+          }}
+          // Check for item change (new track/episode while playing)
+          else if (currentState && currentItemId && lastItemId && currentItemId !== lastItemId) {{
+            console.log(`[DEBUG] Item changed from ${{lastItemId}} to ${{currentItemId}}`);
+            document.body.classList.add('fade-out');
+            setTimeout(() => {{
+              location.reload(true); // Reload to show new track/episode
+            }}, 800);
+          }}
+          
+          lastPlaybackState = currentState;
+          lastItemId = currentItemId;
+        }}
+        
+        // Playing/paused, item, position and version in one request
+        function checkState() {{
+          return fetch('/state{host_path}', {{ headers: stateEtag ? {{ 'If-None-Match': stateEtag }} : {{}} }})
             .then(res => {{
+              if (res.status === 304) return null;
               if (!res.ok) {{
                 throw new Error(`HTTP ${{res.status}}`);
               }}
+              stateEtag = res.headers.get('ETag');
               return res.json();
             }})
             .then(data => {{
-              const currentState = data.playing;
-              const currentItemId = data.item_id;
-              const currentPaused = data.paused;
-              
-              // Update playback button based on pause state
-              if (currentPaused !== lastPausedState) {{
-                updatePlaybackButton(currentPaused);
-                lastPausedState = currentPaused;
-              }}
-              
-              // Check for playback state change (start/stop)
-              if (lastPlaybackState === null) {{
-                lastPlaybackState = currentState;
-                lastItemId = currentItemId;
-                lastPausedState = currentPaused;
-                updatePlaybackButton(currentPaused);
-              }} else if (currentState !== lastPlaybackState) {{
-                document.body.classList.add('fade-out');
-                setTimeout(() => {{
-                  window.location.href = '/'; // Redirect to root when playback stops
-                }}, 1500);
-              }}
-              // Check for item change (new track/episode while playing)
-              else if (currentState && currentItemId && lastItemId && currentItemId !== lastItemId) {{
-                console.log(`[DEBUG] Item changed from ${{lastItemId}} to ${{currentItemId}}`);
-                document.body.classList.add('fade-out');
-                setTimeout(() => {{
-                  location.reload(true); // Reload to show new track/episode
-                }}, 800);
-              }}
-              
-              lastPlaybackState = currentState;
-              lastItemId = currentItemId;
+              if (data) applyState(data);
             }})
             .catch(error => {{
               console.error('Polling error:', error);
-              // Retry after shorter interval on error
-              setTimeout(checkPlaybackChange, 2000);
             }});
         }}
 
+        // Playback changes are pushed over /events; polling is only the fallback
+        let pollTimer = null;
+        
+        function startPolling() {{
+          if (pollTimer) return;
+          console.log('[DEBUG] Event stream unavailable, polling instead');
+          pollTimer = setTimeout(pollState, nextPollMs);
+        }}
+        
+        function pollState() {{
+          checkState().finally(() => {{
+            // Unless the event stream came back in the meantime
+            if (pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+          }});
+        }}
+        
+        function stopPolling() {{
+          clearTimeout(pollTimer);
+          pollTimer = null;
+        }}
+        
+        let events = null;
+        
+        function listenForPlaybackEvents() {{
+          if (!window.EventSource) {{
+            startPolling();
+            return;
+          }}
+          // The browser reconnects on its own, sending Last-Event-ID so only missed changes are replayed
+          events = new EventSource('/events{host_path}');
+          events.onopen = stopPolling;
+          events.onerror = startPolling;
+          events.onmessage = (event) => {{
+            const data = JSON.parse(event.data);
+            console.log(`[DEBUG] Playback event: ${{data.event}} (version ${{data.version}})`);
+            applyState(data);
+          }};
+        }}
+        
+        // A hidden tab stops following playback, so a forgotten tab does not keep
+        // the server polling Kodi - it catches up when it is shown again
+        document.addEventListener('visibilitychange', () => {{
+          if (document.hidden) {{
+            if (events) events.close();
+            events = null;
+            stopPolling();
+            return;
+          }}
+          stateEtag = null;
+          checkState();
+          listenForPlaybackEvents();
+        }});
+
         function toggleMarquee() {{
           const marquee = document.querySelector('.marquee');
           const toggle = document.querySelector('.marquee-toggle');
@@ -831,8 +895,7 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
         waitForDOM();
         
         setInterval(updateTime, 1000);
-        setInterval(resyncTime, 5000);
-        setInterval(checkPlaybackChange, 2000);
+        listenForPlaybackEvents();
         
         // Fanart slideshow functionality
         setTimeout(function() {{
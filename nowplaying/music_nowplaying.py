@@ -3,20 +3,23 @@ Music-specific HTML generation for Kodi Now Playing application.
 Handles music display with album poster, discart/cdart spinning animation, and music-specific layout.
 """
 
-def generate_html(item, session_id, downloaded_art, progress_data, details):
+def generate_html(item, downloaded_art, progress_data, details, host=None):
     """
     Generate HTML for music display.
     
     Args:
         item (dict): Media item from Kodi API
-        session_id (str): Session ID for file naming
         downloaded_art (dict): Downloaded artwork files
         progress_data (dict): Playback progress information
         details (dict): Detailed media information
+        host (str): Kodi host name for pages served under /nowplaying/<host>
         
     Returns:
         str: HTML content for music display
     """
+    # A page for a named host follows that host, and waits on its own page once playback stops
+    host_path = f"/{host}" if host else ""
+    idle_url = f"/nowplaying{host_path}" if host else "/"
     # Extract additional details from the enhanced API calls (define early to avoid variable scope issues)
     # Use safe fallbacks to prevent crashes
     if isinstance(details, dict):
@@ -38,7 +41,7 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
             downloaded_art = {}
         
         # For music, use thumbnail for album artwork, fallback to poster
-        album_poster_url = f"/media/{downloaded_art.get('thumbnail')}" if downloaded_art.get("thumbnail") else f"/media/{downloaded_art.get('poster')}" if downloaded_art.get("poster") else ""
+        album_poster_url = f"/art/{downloaded_art.get('thumbnail')}" if downloaded_art.get("thumbnail") else f"/art/{downloaded_art.get('poster')}" if downloaded_art.get("poster") else ""
         # Collect all fanart variants for slideshow
         fanart_variants = []
         
@@ -46,14 +49,14 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
         # Note: Files in extrafanart folder are named fanart.jpg, fanart2.jpg, etc.
         for key, value in downloaded_art.items():
             if key.startswith("extrafanart"):
-                fanart_variants.append(f"/media/{value}")
+                fanart_variants.append(f"/art/{value}")
         
         # If no extrafanart found, fall back to numbered fanart variants
         if not fanart_variants:
             fanart_keys = ["fanart", "fanart1", "fanart2", "fanart3", "fanart4", "fanart5", "fanart6", "fanart7", "fanart8", "fanart9"]
             for fanart_key in fanart_keys:
                 if downloaded_art.get(fanart_key):
-                    fanart_variants.append(f"/media/{downloaded_art.get(fanart_key)}")
+                    fanart_variants.append(f"/art/{downloaded_art.get(fanart_key)}")
         
         # If no downloaded fanarts, try to get from various sources
         if not fanart_variants:
@@ -91,8 +94,8 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
         fanart_url = ""
         fanart_variants = []
     # Look for both discart and cdart for music
-    discart_url = f"/media/{downloaded_art.get('discart')}" if downloaded_art.get("discart") else ""
-    cdart_url = f"/media/{downloaded_art.get('cdart')}" if downloaded_art.get("cdart") else ""
+    discart_url = f"/art/{downloaded_art.get('discart')}" if downloaded_art.get("discart") else ""
+    cdart_url = f"/art/{downloaded_art.get('cdart')}" if downloaded_art.get("cdart") else ""
     # Use discart if available, otherwise use cdart
     discart_display_url = discart_url if discart_url else cdart_url
     # Only use banner if it's not actually a fanart image
@@ -102,11 +105,11 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
         banner_filename = downloaded_art.get("banner", "")
         print(f"[DEBUG] Banner filename: {banner_filename}", flush=True)
         if not any(fanart_name in banner_filename.lower() for fanart_name in ["fanart", "fanart1", "fanart2", "fanart3", "fanart4"]):
-            banner_url = f"/media/{downloaded_art.get('banner')}"
+            banner_url = f"/art/{downloaded_art.get('banner')}"
             print(f"[DEBUG] Using banner: {banner_url}", flush=True)
         else:
             print(f"[DEBUG] Skipping banner as it appears to be a fanart image", flush=True)
-    clearlogo_url = f"/media/{downloaded_art.get('clearlogo')}" if downloaded_art.get("clearlogo") else ""
+    clearlogo_url = f"/art/{downloaded_art.get('clearlogo')}" if downloaded_art.get("clearlogo") else ""
     # For music, disable clearart completely to prevent fanart from showing underneath album cover
     # Clearart often gets confused with fanart in music libraries
     clearart_url = ""
@@ -754,14 +757,17 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
           }}
         }}
 
-        function resyncTime() {{
-          fetch('/nowplaying?json=1')
-            .then(res => res.json())
-            .then(data => {{
-              elapsed = data.elapsed;
-              duration = data.duration;
-              paused = data.paused;
-            }});
+        // ETag of the last /state answer - a state that has not changed comes back as an empty 304
+        let stateEtag = null;
+        // How long to wait before the next poll - the server adjusts it to what is playing
+        let nextPollMs = 2000;
+        
+        function applyState(data) {{
+          if (data.next_poll_ms) nextPollMs = data.next_poll_ms;
+          elapsed = data.elapsed;
+          duration = data.duration;
+          paused = data.paused;
+          handlePlaybackState(data);
         }}
 
         let lastItemId = null;
@@ -879,56 +885,114 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
           }}
         }}
         
-        function checkPlaybackChange() {{
-          fetch('/poll_playback')
+        function handlePlaybackState(data) {{
+          const currentState = data.playing;
+          const currentItemId = data.item_id;
+          const currentPaused = data.paused;
+          
+          // Update playback button based on pause state
+          if (currentPaused !== lastPausedState) {{
+            updatePlaybackButton(currentPaused);
+            lastPausedState = currentPaused;
+          }}
+          
+          // Check for playback state change (start/stop)
+          if (lastPlaybackState === null) {{
+            lastPlaybackState = currentState;
+            lastItemId = currentItemId;
+            lastPausedState = currentPaused; // Initialize lastPausedState
+            updatePlaybackButton(currentPaused);
+          }} else if (currentState !== lastPlaybackState) {{
+            document.body.classList.add('fade-out');
+            setTimeout(() => {{
+              window.location.href = '{idle_url}'; // Redirect to the idle page when playback stops
+            }}, 1500);
+          }}
+          // Check for item change (new track/episode while playing)
+          else if (currentState && currentItemId && lastItemId && currentItemId !== lastItemId) {{
+            console.log(`[DEBUG] Item changed from ${{lastItemId}} to ${{currentItemId}}`);
+            document.body.classList.add('fade-out');
+            setTimeout(() => {{
+              location.reload(true); // Reload to show new track/episode
+            }}, 800);
+          }}
+          
+          lastPlaybackState = currentState;
+          lastItemId = currentItemId;
+        }}
+        
+        // Playing/paused, item, position and version in one request
+        function checkState() {{
+          return fetch('/state{host_path}', {{ headers: stateEtag ? {{ 'If-None-Match': stateEtag }} : {{}} }})
             .then(res => {{
+              if (res.status === 304) return null;
               if (!res.ok) {{
                 throw new Error(`HTTP ${{res.status}}`);
               }}
+              stateEtag = res.headers.get('ETag');
               return res.json();
             }})
             .then(data => {{
-              const currentState = data.playing;
-              const currentItemId = data.item_id;
-              const currentPaused = data.paused;
-              
-              // Update playback button based on pause state
-              if (currentPaused !== lastPausedState) {{
-                updatePlaybackButton(currentPaused);
-                lastPausedState = currentPaused;
-              }}
-              
-              // Check for playback state change (start/stop)
-              if (lastPlaybackState === null) {{
-                lastPlaybackState = currentState;
-                lastItemId = currentItemId;
-                lastPausedState = currentPaused; // Initialize lastPausedState
-                updatePlaybackButton(currentPaused);
-              }} else if (currentState !== lastPlaybackState) {{
-                document.body.classList.add('fade-out');
-                setTimeout(() => {{
-                  window.location.href = '/'; // Redirect to root when playback stops
-                }}, 1500);
-              }}
-              // Check for item change (new track/episode while playing)
-              else if (currentState && currentItemId && lastItemId && currentItemId !== lastItemId) {{
-                console.log(`[DEBUG] Item changed from ${{lastItemId}} to ${{currentItemId}}`);
-                document.body.classList.add('fade-out');
-                setTimeout(() => {{
-                  location.reload(true); // Reload to show new track/episode
-                }}, 800);
-              }}
-              
-              lastPlaybackState = currentState;
-              lastItemId = currentItemId;
+              if (data) applyState(data);
             }})
             .catch(error => {{
               console.error('Polling error:', error);
-              // Retry after shorter interval on error
-              setTimeout(checkPlaybackChange, 2000);
             }});
         }}
 
+        // Playback changes are pushed over /events; polling is only the fallback
+        let pollTimer = null;
+        
+        function startPolling() {{
+          if (pollTimer) return;
+          console.log('[DEBUG] Event stream unavailable, polling instead');
+          pollTimer = setTimeout(pollState, nextPollMs);
+        }}
+        
+        function pollState() {{
+          checkState().finally(() => {{
+            // Unless the event stream came back in the meantime
+            if (pollTimer) pollTimer = setTimeout(pollState, nextPollMs);
+          }});
+        }}
+        
+        function stopPolling() {{
+          clearTimeout(pollTimer);
+          pollTimer = null;
+        }}
+        
+        let events = null;
+        
+        function listenForPlaybackEvents() {{
+          if (!window.EventSource) {{
+            startPolling();
+            return;
+          }}
+          // The browser reconnects on its own, sending Last-Event-ID so only missed changes are replayed
+          events = new EventSource('/events{host_path}');
+          events.onopen = stopPolling;
+          events.onerror = startPolling;
+          events.onmessage = (event) => {{
+            const data = JSON.parse(event.data);
+            console.log(`[DEBUG] Playback event: ${{data.event}} (version ${{data.version}})`);
+            applyState(data);
+          }};
+        }}
+        
+        // A hidden tab stops following playback, so a forgotten tab does not keep
+        // the server polling Kodi - it catches up when it is shown again
+        document.addEventListener('visibilitychange', () => {{
+          if (document.hidden) {{
+            if (events) events.close();
+            events = null;
+            stopPolling();
+            return;
+          }}
+          stateEtag = null;
+          checkState();
+          listenForPlaybackEvents();
+        }});
+
         function toggleMarquee() {{
           const marquee = document.querySelector('.marquee');
           const toggle = document.querySelector('.marquee-toggle');
@@ -1066,8 +1130,7 @@ def generate_html(item, session_id, downloaded_art, progress_data, details):
         waitForDOM();
         
         setInterval(updateTime, 1000);
-        setInterval(resyncTime, 5000);
-        setInterval(checkPlaybackChange, 2000);
+        listenForPlaybackEvents();
       </script>
     </head>
     <body>
@@ -45,16 +45,16 @@ def get_media_handler(playback_type):
     else:
         raise ValueError(f"Unknown playback type: {playback_type}")
 
-def route_media_display(item, session_id, downloaded_art, progress_data, details):
+def route_media_display(item, downloaded_art, progress_data, details, host=None):
     """
     Route media display to the appropriate handler based on media type.
     
     Args:
         item (dict): Media item from Kodi API
-        session_id (str): Session ID for file naming
         downloaded_art (dict): Downloaded artwork files
         progress_data (dict): Playback progress information
         details (dict): Detailed media information
+        host (str): Kodi host name for pages served under /nowplaying/<host>
         
     Returns:
         str: HTML content for the media display
@@ -62,4 +62,4 @@ def route_media_display(item, session_id, downloaded_art, progress_data, details
     playback_type = infer_playback_type(item)
     handler = get_media_handler(playback_type)
     
-    return handler.generate_html(item, session_id, downloaded_art, progress_data, details)
+    return handler.generate_html(item, downloaded_art, progress_data, details, host)
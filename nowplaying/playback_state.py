@@ -0,0 +1,384 @@
+"""
+Shared playback state for Kodi Now Playing application.
+A single background poller talks to Kodi and publishes immutable PlaybackState
+snapshots. Routes read the latest snapshot from memory instead of querying Kodi
+per request, so Kodi load stays flat no matter how many displays are open.
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+
+# Position drift (seconds) beyond which a new sample counts as a seek
+SEEK_TOLERANCE = 2.0
+
+# Look the item up again this many seconds after its predicted end
+ITEM_END_MARGIN = 1.0
+
+
+def kodi_time_to_seconds(t):
+    """Convert a Kodi time object ({hours, minutes, seconds, ...}) to whole seconds"""
+    if not t:
+        return 0
+    return t.get("hours", 0) * 3600 + t.get("minutes", 0) * 60 + t.get("seconds", 0)
+
+
+def next_item_check(ends_at, last_check, interval, max_interval):
+    """
+    When the playing item should be looked up again with Player.GetItem.
+
+    Items only change at their end (or on a seek/skip, which moves the predicted
+    end), so the check is scheduled just after the predicted end instead of on a
+    fixed interval, but never later than max_interval after the previous check.
+
+    Args:
+        ends_at (float): Predicted time.monotonic() of the item's end, None when unknown
+            (paused, live streams)
+        last_check (float): time.monotonic() of the previous item check
+        interval (float): Seconds between checks when the end cannot be predicted
+        max_interval (float): Seconds between checks at most
+
+    Returns:
+        float: time.monotonic() at which the item check is due
+    """
+    if ends_at is None:
+        return last_check + interval
+    return min(ends_at + ITEM_END_MARGIN, last_check + max_interval)
+
+
+def end_moved(old_end, new_end):
+    """True when a new sample moves the predicted end of the item - a seek or a different item"""
+    if old_end is None or new_end is None:
+        return False
+    return abs(new_end - old_end) > SEEK_TOLERANCE
+
+
+@dataclass(frozen=True)
+class PlaybackState:
+    """Immutable snapshot of what Kodi is playing - replaced, never mutated"""
+    playing: bool = False
+    player_id: int = None
+    item_id: str = None
+    speed: float = 0
+    time: float = 0          # Position in seconds when the snapshot was sampled
+    totaltime: float = 0     # Item length in seconds
+    version: int = 0         # Bumped whenever something a client reacts to changes
+    updated_at: float = 0    # time.monotonic() of the position sample
+
+    @property
+    def paused(self):
+        return self.playing and self.speed == 0
+
+    def elapsed(self, now=None):
+        """Current position, extrapolated from the last sample at the current speed"""
+        if not self.playing or self.speed == 0:
+            return self.time
+        now = time.monotonic() if now is None else now
+        elapsed = max(self.time + (now - self.updated_at) * self.speed, 0)
+        return min(elapsed, self.totaltime) if self.totaltime else elapsed
+
+    @property
+    def ends_at(self):
+        """Predicted time.monotonic() of the item's end, or None while paused or of unknown length"""
+        if not self.playing or self.speed <= 0 or not self.totaltime:
+            return None
+        return self.updated_at + max(self.totaltime - self.time, 0) / self.speed
+
+
+STOPPED = dict(playing=False, player_id=None, item_id=None, speed=0, time=0, totaltime=0)
+
+
+@dataclass(frozen=True)
+class TrackedPlayer:
+    """What per-request polling remembers about one Kodi player - replaced, never mutated"""
+    item_id: str = None
+    checked_at: float = 0     # time.monotonic() of the last item check
+    ends_at: float = None     # Predicted time.monotonic() of the item's end
+    recheck: bool = False     # Seeked or skipped - look the item up on the next poll
+    sampled_at: float = 0     # time.monotonic() the latest recorded sample was taken
+
+    def item_check_due(self, now, interval, max_interval):
+        return self.item_id is None or self.recheck or \
+            now >= next_item_check(self.ends_at, self.checked_at, interval, max_interval)
+
+    def record(self, sampled_at, ends_at, item_id=None, item_checked=False):
+        """
+        Entry after a new sample of the player. A sample older than the one already
+        recorded is ignored, so a slow request cannot roll the player back.
+
+        Args:
+            sampled_at (float): time.monotonic() the sample was requested
+            ends_at (float): Predicted end from the sample, None when unknown
+            item_id (str): Item identified by the sample, if any
+            item_checked (bool): The sample included the player's item
+
+        Returns:
+            TrackedPlayer: The new entry, or self when the sample is stale
+        """
+        if sampled_at < self.sampled_at:
+            return self
+        if item_checked:
+            return TrackedPlayer(item_id=item_id or self.item_id, checked_at=sampled_at, ends_at=ends_at, sampled_at=sampled_at)
+        return replace(self, ends_at=ends_at, sampled_at=sampled_at,
+                       recheck=self.recheck or end_moved(self.ends_at, ends_at))
+
+
+class PlayerStore:
+    """
+    TrackedPlayer per (Kodi host, player id), shared by request threads.
+
+    The mapping is copied on write and swapped in whole under a lock, so reads
+    need no locking and never see half an update, and each update is computed
+    from the entry it replaces.
+    """
+
+    def __init__(self):
+        self._players = {}
+        self._lock = threading.Lock()
+
+    def players(self, host):
+        """Tracked players of a host as {player_id: TrackedPlayer}"""
+        players = self._players
+        return {player_id: tracked for (player_host, player_id), tracked in players.items() if player_host == host}
+
+    def update(self, host, player_id, change):
+        """
+        Atomically replace one player's entry.
+
+        Args:
+            host (str): Kodi host the player belongs to
+            player_id (int): Kodi player id
+            change (callable): change(current TrackedPlayer or None) -> new TrackedPlayer.
+                Runs under the store's lock, so it must not block
+
+        Returns:
+            tuple: (previous entry or None, new entry)
+        """
+        key = (host, player_id)
+        with self._lock:
+            previous = self._players.get(key)
+            tracked = change(previous)
+            if tracked is not previous:
+                self._players = {**self._players, key: tracked}
+            return previous, tracked
+
+    def retain(self, host, player_ids):
+        """Forget the players of host that are no longer active"""
+        with self._lock:
+            self._players = {
+                key: tracked for key, tracked in self._players.items()
+                if key[0] != host or key[1] in player_ids
+            }
+
+    def stats(self):
+        return {"players": len(self._players)}
+
+
+class PlaybackPoller:
+    """
+    Background thread keeping the shared PlaybackState up to date.
+
+    Args:
+        fetch (callable): fetch(check_item) -> dict with player_id, item_id (None when
+            the item was not requested), speed, time and totaltime, or None when
+            nothing is playing
+        interval (float): Seconds between polls
+        pushed_interval (float): Seconds between polls while is_pushed() is true
+        item_check_interval (float): Seconds between Player.GetItem checks while the end
+            of the item cannot be predicted
+        item_check_max_interval (float): Seconds between Player.GetItem checks at most
+            while the item plays towards a predicted end
+        is_pushed (callable): Returns True while Kodi notifications are arriving, which
+            makes polling a consistency check rather than the source of changes
+        unwatched_interval (float): Seconds between polls while is_watched() is false
+        is_watched (callable): Returns True while any display follows this state
+        idle_backoff (IdleBackoff): Stretches the gap between polls while nothing plays;
+            reset whenever the poller is woken
+    """
+
+    def __init__(self, fetch, interval=1.0, pushed_interval=10.0, item_check_interval=10.0,
+                 item_check_max_interval=300.0, is_pushed=None, unwatched_interval=60.0, is_watched=None,
+                 idle_backoff=None):
+        self.fetch = fetch
+        self.interval = interval
+        self.pushed_interval = pushed_interval
+        self.item_check_interval = item_check_interval
+        self.item_check_max_interval = item_check_max_interval
+        self.is_pushed = is_pushed or (lambda: False)
+        self.unwatched_interval = unwatched_interval
+        self.is_watched = is_watched or (lambda: True)
+        self.idle_backoff = idle_backoff
+        self.polls = 0
+        self.item_checks = 0
+        self._state = PlaybackState()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._last_item_check = 0
+        self._recheck_item = False
+        self._event_seq = 0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        """Latest published state - a plain attribute read, no locking needed"""
+        return self._state
+
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="playback-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def wait_for_change(self, version, timeout=None):
+        """
+        Block until a snapshot with a different version is published, or timeout passes.
+
+        Args:
+            version (int): Version the caller already has
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            PlaybackState: The latest snapshot - check its version to tell a change from a timeout
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._state.version != version, timeout)
+            return self._state
+
+    def wake(self):
+        """Poll again right away instead of waiting for the next interval"""
+        if self.idle_backoff:
+            self.idle_backoff.reset()
+        self._wake.set()
+
+    def publish(self, **changes):
+        """
+        Atomically replace the snapshot with one carrying the given changes.
+
+        Returns:
+            PlaybackState: The published snapshot
+        """
+        with self._lock:
+            current = self._state
+            now = time.monotonic()
+            if changes.get("item_id", current.item_id) != current.item_id:
+                # A new item starts from its own position and length, not the previous item's
+                changes.setdefault("time", 0)
+                changes.setdefault("totaltime", 0)
+            if "time" in changes:
+                changes.setdefault("updated_at", now)
+            elif "speed" in changes and changes["speed"] != current.speed:
+                # Re-anchor the position so extrapolation continues from where it is now
+                changes.update(time=current.elapsed(now), updated_at=now)
+            candidate = replace(current, **changes)
+            changed = self._is_change(current, candidate, now)
+            if changed:
+                candidate = replace(candidate, version=current.version + 1)
+            self._state = candidate
+            if changed:
+                self._changed.notify_all()
+            return candidate
+
+    def apply_event(self, **changes):
+        """Publish changes reported by a Kodi notification and confirm them with a poll"""
+        with self._lock:
+            self._event_seq += 1
+        state = self.publish(**changes)
+        self.wake()
+        return state
+
+    def poll_once(self):
+        state = self._state
+        now = time.monotonic()
+        check_item = state.item_id is None or self._recheck_item or now >= next_item_check(
+            state.ends_at, self._last_item_check, self.item_check_interval, self.item_check_max_interval)
+        event_seq = self._event_seq
+        try:
+            result = self.fetch(check_item)
+        except Exception as e:
+            print(f"[ERROR] Playback poll failed: {e}", flush=True)
+            return
+        self.polls += 1
+
+        # A notification landed while we were waiting on Kodi, so this sample may
+        # already be stale - drop it, the notification queued another poll
+        if event_seq != self._event_seq:
+            return
+
+        if result is None:
+            if self.idle_backoff:
+                self.idle_backoff.stopped()
+            self.publish(**STOPPED)
+            return
+        if self.idle_backoff:
+            self.idle_backoff.reset()
+
+        changes = dict(
+            playing=True,
+            player_id=result["player_id"],
+            speed=result["speed"],
+            time=result["time"],
+            totaltime=result["totaltime"],
+        )
+        if check_item:
+            self._last_item_check = now
+            self._recheck_item = False
+            self.item_checks += 1
+            changes["item_id"] = result["item_id"]
+        elif result["player_id"] != state.player_id:
+            # Another player took over and its item is unknown - look it up straight away
+            changes["item_id"] = None
+            self.wake()
+        published = self.publish(**changes)
+        if not check_item and end_moved(state.ends_at, published.ends_at):
+            # Seeked or skipped - the check scheduled for the old end no longer fits
+            self._recheck_item = True
+            self.wake()
+
+    def _interval(self):
+        # Nothing playing - wait out the idle backoff unless a notification or a display wakes the poller
+        idle_wait = self.idle_backoff.wait() if self.idle_backoff else 0
+        if not self.is_watched():
+            # Nobody is looking - a slow heartbeat until a display wakes the poller
+            return max(self.unwatched_interval, idle_wait)
+        interval = self.pushed_interval if self.is_pushed() else self.interval
+        # Wake just after the item is predicted to end so the next one is seen straight away
+        ends_at = self._state.ends_at
+        if ends_at is not None:
+            until_end = ends_at + ITEM_END_MARGIN - time.monotonic()
+            if until_end > 0:
+                interval = min(interval, until_end)
+        return max(interval, idle_wait)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # Clear before polling so a wake() that arrives mid-poll triggers another one
+            self._wake.clear()
+            self.poll_once()
+            self._wake.wait(self._interval())
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "polls": self.polls,
+            "item_checks": self.item_checks,
+            "version": self._state.version,
+        }
+
+    @staticmethod
+    def _is_change(old, new, now):
+        if (old.playing, old.player_id, old.item_id, old.speed, old.totaltime) != \
+                (new.playing, new.player_id, new.item_id, new.speed, new.totaltime):
+            return True
+        # A position jump that extrapolation cannot explain is a seek
+        return abs(new.elapsed(now) - old.elapsed(now)) > SEEK_TOLERANCE
@@ -0,0 +1,118 @@
+"""
+Bounded TTL/LRU cache for Kodi Now Playing application.
+Holds responses to idempotent Kodi library lookups (movie, episode, song, album
+and artist details) so repeat renders of the same item skip those RPCs.
+"""
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Library detail methods worth caching, and the param carrying the library id
+LIBRARY_DETAIL_METHODS = {
+    "VideoLibrary.GetMovieDetails": "movieid",
+    "VideoLibrary.GetEpisodeDetails": "episodeid",
+    "AudioLibrary.GetSongDetails": "songid",
+    "AudioLibrary.GetAlbumDetails": "albumid",
+    "AudioLibrary.GetArtistDetails": "artistid",
+}
+
+# Library item type (as sent in *.OnUpdate/*.OnRemove notifications) -> details method
+LIBRARY_TYPE_METHODS = {
+    "movie": "VideoLibrary.GetMovieDetails",
+    "episode": "VideoLibrary.GetEpisodeDetails",
+    "song": "AudioLibrary.GetSongDetails",
+    "album": "AudioLibrary.GetAlbumDetails",
+    "artist": "AudioLibrary.GetArtistDetails",
+}
+
+
+def library_cache_key(method, params, library=None):
+    """
+    Cache key for a library lookup.
+
+    Args:
+        method (str): JSON-RPC method
+        params (dict): JSON-RPC params
+        library (str): Name of the library the ids belong to, when several are cached
+
+    Returns:
+        tuple: (method, library id, serialized params, library), or None when the call is not cacheable
+    """
+    id_field = LIBRARY_DETAIL_METHODS.get(method)
+    if not id_field or not params or params.get(id_field) is None:
+        return None
+    return (method, params[id_field], json.dumps(params, sort_keys=True), library)
+
+
+class TTLCache:
+    """
+    Thread-safe cache with a maximum entry count (least recently used entries are
+    evicted first) and a time-to-live per entry. Values are deep-copied on the
+    way in and out so callers can never mutate what is cached.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is evicted
+        ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        """
+        Drop every entry whose key matches predicate(key).
+
+        Returns:
+            int: Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def purge(self):
+        """Drop everything. Returns the number of entries dropped"""
+        return self.invalidate(lambda key: True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,95 @@
+"""
+Request coalescing for Kodi Now Playing application.
+When several threads ask for the same thing at the same moment (e.g. every
+display reloading after an item change), only the first one calls Kodi - the
+rest wait for it and share the result.
+"""
+import copy
+import threading
+
+
+class FlightTimeout(Exception):
+    """Raised to a caller that gave up waiting for the in-flight call it joined"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and hand its result to every concurrent caller"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = {}
+        self._coalesced = {}
+
+    def do(self, key, fn, name=None, timeout=None):
+        """
+        Call fn() unless a call for key is already in flight, in which case wait for that one.
+
+        Args:
+            key (hashable): Identity of the call - equal keys share one execution
+            fn (callable): Does the actual work
+            name (str): Label the call is counted under in stats()
+            timeout (float): Seconds to wait for an in-flight call, None to wait for it to finish
+
+        Returns:
+            The result of fn(). Waiting callers get their own deep copy of a
+            snapshot taken before the caller running fn() returns, so mutating
+            any of them cannot affect anyone else.
+
+        Raises:
+            FlightTimeout: When the in-flight call is still running after timeout seconds
+        """
+        name = name or str(key)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._executed[name] = self._executed.get(name, 0) + 1
+            else:
+                self._coalesced[name] = self._coalesced.get(name, 0) + 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise FlightTimeout(f"{name} still in flight after {timeout:.1f}s")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn()
+            # Waiters copy from a snapshot taken before they are released, so the
+            # leader is free to mutate the result it returns
+            call.result = copy.deepcopy(result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result
+
+    def stats(self):
+        """
+        Returns:
+            dict: Calls executed and calls coalesced onto an in-flight one, overall and per name
+        """
+        with self._lock:
+            names = sorted(set(self._executed) | set(self._coalesced))
+            return {
+                "executed": sum(self._executed.values()),
+                "coalesced": sum(self._coalesced.values()),
+                "by_method": {
+                    name: {"executed": self._executed.get(name, 0), "coalesced": self._coalesced.get(name, 0)}
+                    for name in names
+                },
+            }